@@ -0,0 +1,149 @@
+# benchmarks/bench_categorize.py
+"""
+Count model requests and tokens per 1,000 leads: old per-lead categorize call
+versus the batched, memoized categorizer.
+
+Runs a fake OpenAI-compatible chat endpoint on localhost that counts requests
+and prompt/completion tokens (estimated at ~4 characters per token).
+
+Usage: python -m benchmarks.bench_categorize [--leads 1000] [--repeat-ratio 0.3]
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Fresh memo and response cache so the first pass measures cold behaviour.
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault("LEAD_CATEGORY_MEMO", os.path.join(_tmp, "lead_categories.db"))
+os.environ.setdefault("LLM_CACHE_PATH", os.path.join(_tmp, "llm_cache.db"))
+
+from openai import OpenAI
+
+from utils.lead_categorizer import CATEGORY_MODEL, categorize_leads
+
+COUNTERS = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
+_counter_lock = threading.Lock()
+
+
+def _tokens(text):
+    return max(1, len(text) // 4)
+
+
+class _FakeOpenAIHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = "".join(m["content"] for m in payload["messages"])
+        user = payload["messages"][-1]["content"]
+        numbers = re.findall(r"^(\d+)\. ", user, flags=re.MULTILINE)
+        if payload.get("response_format", {}).get("type") == "json_object":
+            content = json.dumps({n: "Event Venue" for n in numbers})
+        else:
+            content = "Event Venue"
+        usage = {"prompt_tokens": _tokens(prompt), "completion_tokens": _tokens(content)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        with _counter_lock:
+            COUNTERS["requests"] += 1
+            COUNTERS["prompt_tokens"] += usage["prompt_tokens"]
+            COUNTERS["completion_tokens"] += usage["completion_tokens"]
+
+        body = json.dumps({
+            "id": "chatcmpl-bench", "object": "chat.completion", "created": int(time.time()),
+            "model": payload["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": usage,
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _synthetic_leads(n, repeat_ratio, seed=7):
+    rng = random.Random(seed)
+    clear = [
+        "Our wedding venue and banquet hall hosts events; book the ballroom or event space today.",
+        "Award-winning restaurant and bistro. Reservations for the tasting menu open weekly. Catering available.",
+        "Daily yoga and meditation classes, sound bath evenings and a wellness retreat centre.",
+    ]
+    vague = [
+        "Welcome to {name}. We help people create memorable moments. Get in touch.",
+        "{name} — about us, our story, team and contact details. Based downtown since 1998.",
+        "Discover {name}. Experiences, gifts and more for every occasion.",
+    ]
+    leads = []
+    for i in range(n):
+        if leads and rng.random() < repeat_ratio:
+            leads.append(dict(rng.choice(leads)))
+            continue
+        name = f"Business {i}"
+        template = rng.choice(clear) if rng.random() < 0.4 else rng.choice(vague).format(name=name)
+        leads.append({"url": f"https://site{i}.example/", "raw_text": template + " " + "Filler text. " * 30})
+    return leads
+
+
+def _reset():
+    for k in COUNTERS:
+        COUNTERS[k] = 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--leads", type=int, default=1000)
+    parser.add_argument("--repeat-ratio", type=float, default=0.3)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeOpenAIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = OpenAI(base_url=f"http://127.0.0.1:{server.server_address[1]}/v1", api_key="bench")
+    leads = _synthetic_leads(args.leads, args.repeat_ratio)
+
+    try:
+        # Old path: one chat call per lead with the full 5k snippet
+        _reset()
+        start = time.perf_counter()
+        for lead in leads:
+            client.chat.completions.create(
+                model=CATEGORY_MODEL,
+                messages=[
+                    {"role": "system", "content": "Classify the business type in one or two words."},
+                    {"role": "user", "content": lead["raw_text"]}
+                ]
+            )
+        old = dict(COUNTERS, seconds=time.perf_counter() - start)
+
+        _reset()
+        start = time.perf_counter()
+        stats = {}
+        categorize_leads(leads, client=client, stats=stats)
+        new = dict(COUNTERS, seconds=time.perf_counter() - start)
+
+        _reset()
+        start = time.perf_counter()
+        warm_stats = {}
+        categorize_leads(leads, client=client, stats=warm_stats)
+        warm = dict(COUNTERS, seconds=time.perf_counter() - start)
+    finally:
+        server.shutdown()
+
+    print(f"[BENCH] leads={args.leads} repeat_ratio={args.repeat_ratio}")
+    for name, row in (("old per-lead", old), ("batched (cold)", new), ("batched (warm)", warm)):
+        print(f"[BENCH] {name:15s} requests={row['requests']:5d} prompt_tokens={row['prompt_tokens']:8d} "
+              f"completion_tokens={row['completion_tokens']:6d} time={row['seconds']:.2f}s")
+    print(f"[BENCH] cold stats: {stats}")
+    print(f"[BENCH] warm stats: {warm_stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# benchmarks/bench_docs_memory.py
+"""
+Count Docs API calls and time for loading training-note memory: the old
+one-documents.get-per-doc loop versus the cached, batched fetch.
+
+Uses in-memory fake Drive and Docs services shaped like googleapiclient's
+(request objects with .execute(), new_batch_http_request). Each HTTP round
+trip sleeps --latency-ms; a batch call counts as one round trip.
+
+Usage: python -m benchmarks.bench_docs_memory [--docs 50] [--paragraphs 400] [--runs 3]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault("DOCS_CACHE_PATH", os.path.join(_tmp, "docs_cache.db"))
+
+from utils import google_docs_uploader as uploader
+
+COUNTERS = {"round_trips": 0, "documents_get": 0}
+
+
+class _Request:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self):
+        COUNTERS["round_trips"] += 1
+        time.sleep(LATENCY)
+        return self._fn()
+
+
+class _Batch:
+    def __init__(self, callback):
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, request_id):
+        self._requests.append((request_id, request))
+
+    def execute(self):
+        COUNTERS["round_trips"] += 1
+        time.sleep(LATENCY)
+        for request_id, request in self._requests:
+            self._callback(request_id, request._fn(), None)
+
+
+class FakeDocs:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def documents(self):
+        return self
+
+    def get(self, documentId):
+        def _get():
+            COUNTERS["documents_get"] += 1
+            return self.docs[documentId]["body"]
+        return _Request(_get)
+
+    def new_batch_http_request(self, callback):
+        return _Batch(callback)
+
+
+class FakeDrive:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def files(self):
+        return self
+
+    def list(self, pageSize, **kwargs):
+        files = sorted(self.docs.values(), key=lambda d: d["modifiedTime"], reverse=True)[:pageSize]
+        return _Request(lambda: {"files": [{k: d[k] for k in ("id", "name", "modifiedTime")} for d in files]})
+
+
+def _make_docs(n, paragraphs):
+    docs = {}
+    for i in range(n):
+        content = [{"paragraph": {"elements": [{"textRun": {"content": f"Note {i} point {j}: keep follow-ups warm.\n"}}]}}
+                   for j in range(paragraphs)]
+        docs[f"doc{i}"] = {"id": f"doc{i}", "name": f"Training Notes {i}", "modifiedTime": f"2026-01-01T00:{i:02d}:00Z",
+                           "body": {"body": {"content": content}}}
+    return docs
+
+
+def legacy_memory(limit):
+    memory_context = ""
+    for doc in uploader.list_recent_docs(limit):
+        d = uploader.docs_service.documents().get(documentId=doc["id"]).execute()
+        text = ""
+        for elem in d.get("body", {}).get("content", []):
+            if "paragraph" in elem:
+                for p in elem["paragraph"].get("elements", []):
+                    text += p.get("textRun", {}).get("content", "")
+        memory_context += f"\n--- Memory from {doc['name']} ---\n{text.strip()}\n"
+    return memory_context
+
+
+def cached_memory(limit):
+    files = uploader.list_recent_docs(limit)
+    return "".join(f"\n--- Memory from {f['name']} ---\n{text}\n"
+                   for f, text in zip(files, uploader.fetch_documents(files)))
+
+
+def main():
+    global LATENCY
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=50)
+    parser.add_argument("--paragraphs", type=int, default=400)
+    parser.add_argument("--runs", type=int, default=3, help="memory loads per path (one doc edited between runs)")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    LATENCY = args.latency_ms / 1000
+
+    print(f"{args.docs} docs x {args.paragraphs} paragraphs, {args.latency_ms:.0f} ms per round trip")
+    print(f"{'path':<16} {'run':>4} {'round trips':>12} {'docs fetched':>13} {'seconds':>8}")
+    for label, load in (("get per doc", legacy_memory), ("cached batch", cached_memory)):
+        docs = _make_docs(args.docs, args.paragraphs)
+        uploader.docs_service, uploader.drive_service = FakeDocs(docs), FakeDrive(docs)
+        outputs = []
+        for run in range(args.runs):
+            COUNTERS.update(round_trips=0, documents_get=0)
+            start = time.perf_counter()
+            outputs.append(load(args.docs))
+            elapsed = time.perf_counter() - start
+            print(f"{label:<16} {run + 1:>4} {COUNTERS['round_trips']:>12} {COUNTERS['documents_get']:>13} {elapsed:>8.2f}")
+            docs["doc0"]["modifiedTime"] = f"2026-02-01T00:00:{run:02d}Z"  # someone edits one doc
+        if label == "get per doc":
+            expected = outputs
+        else:
+            assert outputs == expected, "memory text differs"
+
+
+if __name__ == "__main__":
+    main()
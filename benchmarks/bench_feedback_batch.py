@@ -0,0 +1,111 @@
+# benchmarks/bench_feedback_batch.py
+"""
+Time the feedback analysis chain over a large export: the three single-entry
+tools called once per entry (as the chain runs today) versus
+utils.feedback_batch.analyze_feedback_batch.
+
+The per-entry path below is the tools' code before batch mode, inlined so the
+benchmark runs without crewai.
+
+Usage: python -m benchmarks.bench_feedback_batch [--entries 100000]
+"""
+
+import argparse
+import random
+import time
+
+from utils.feedback_batch import NEGATIVE, POSITIVE, analyze_feedback_batch, iter_entry_results
+
+_VOCAB = (
+    "the staff was good great slow noisy delay clean room hate love whatever glove badly terrible awful "
+    "excellent amazing dirty poor wonderful "
+    + "venue guide booking check-in concert sound ticket parking friendly helpful music crowd lighting "
+      "schedule food drinks queue entrance seats view tour event service we our and but a bit very " * 4
+).split()
+
+
+def _entries(n, seed=7):
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(_VOCAB, k=rng.randint(4, 40))).capitalize() + "." for _ in range(n)]
+
+
+def legacy_summary(feedback_data):
+    items = []
+    for entry in feedback_data:
+        text = entry.get("text", "") if isinstance(entry, dict) else str(entry)
+        text = text.strip()
+        if text:
+            items.append(text)
+    if not items:
+        return "No valid feedback entries."
+    top = items[:3]
+    joined = " | ".join(top)
+    if len(joined) > 800:
+        joined = joined[:797] + "..."
+    return f"Feedback Summary (top {len(top)}): {joined}"
+
+
+def legacy_sentiment(feedback_summary):
+    text = feedback_summary.lower()
+    pos_score = sum(text.count(w) for w in POSITIVE)
+    neg_score = sum(text.count(w) for w in NEGATIVE)
+    if pos_score > neg_score:
+        return f"Positive: Detected {pos_score} positive tokens vs {neg_score} negative tokens."
+    if neg_score > pos_score:
+        return f"Negative: Detected {neg_score} negative tokens vs {pos_score} positive tokens."
+    return f"Neutral: No clear positive/negative dominance ({pos_score} pos / {neg_score} neg)."
+
+
+def legacy_actions(summary, sentiment):
+    label = sentiment.split(":")[0].strip().capitalize()
+    actions = []
+    if "Negative" in label:
+        actions.append("1) Immediately assign a staff member to address major concerns raised.")
+        actions.append("2) Offer resolution or concession where appropriate to rebuild trust.")
+        actions.append("3) Log detailed issue into knowledge base for root-cause analysis.")
+    elif "Positive" in label:
+        actions.append("1) Follow up with thankful outreach and request for testimonial.")
+        actions.append("2) Identify high-engagement leads for next-step conversion outreach.")
+    else:
+        actions.append("1) Request more detail from neutral responses to clarify intent.")
+        actions.append("2) Monitor for patterns over the next campaign cycle.")
+    actions.append("Final) Incorporate feedback into next campaign brief and update outreach templates.")
+    return f"Sentiment: {label}\nSummary: {summary}\n\nRecommended Actions:\n" + "\n".join(actions)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=100_000)
+    args = parser.parse_args()
+
+    entries = _entries(args.entries)
+    print(f"{len(entries):,} feedback entries, {sum(map(len, entries)) / 1e6:.1f} MB of text")
+
+    start = time.perf_counter()
+    legacy = []
+    for entry in entries:
+        summary = legacy_summary([entry])
+        sentiment = legacy_sentiment(summary)
+        legacy.append((summary, sentiment, legacy_actions(summary, sentiment)))
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = analyze_feedback_batch(entries)
+    batch_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    per_entry = [(r["summary"], r["sentiment"], r["actions"]) for r in iter_entry_results(result)]
+    strings_seconds = time.perf_counter() - start
+
+    assert per_entry == legacy, "batch results differ from the per-entry chain"
+
+    print(f"{'path':<38} {'seconds':>8} {'entries/s':>11}")
+    for label, seconds in (("per-entry tool chain", legacy_seconds),
+                           ("batch (counts, labels, aggregate)", batch_seconds),
+                           ("batch + per-entry strings", batch_seconds + strings_seconds)):
+        print(f"{label:<38} {seconds:>8.2f} {len(entries) / seconds:>11,.0f}")
+    print(f"aggregate: {result['aggregate']['labels']} | {result['aggregate']['sentiment']}")
+
+
+if __name__ == "__main__":
+    main()
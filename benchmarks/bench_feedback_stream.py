@@ -0,0 +1,54 @@
+# benchmarks/bench_feedback_stream.py
+"""
+Peak memory of aggregating a feedback export: loading it into a list and
+running analyze_feedback_batch (grows with the export) versus streaming it
+through utils.feedback_stream.FeedbackAggregator (flat).
+
+Entries are generated lazily so the streaming path never holds the export.
+
+Usage: python -m benchmarks.bench_feedback_stream [--entries 100000 400000]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from utils.feedback_batch import analyze_feedback_batch
+from utils.feedback_stream import FeedbackAggregator
+
+from benchmarks.bench_feedback_batch import _VOCAB
+
+
+def _entries(n, seed=7):
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield " ".join(rng.choices(_VOCAB, k=rng.randint(4, 40))).capitalize() + "."
+
+
+def _measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, nargs="+", default=[100_000, 400_000])
+    args = parser.parse_args()
+
+    print(f"{'entries':>9} {'path':<10} {'seconds':>8} {'peak MB':>9}")
+    for n in args.entries:
+        batch, batch_seconds, batch_peak = _measure(lambda: analyze_feedback_batch(list(_entries(n))))
+        stream, stream_seconds, stream_peak = _measure(lambda: FeedbackAggregator().ingest(_entries(n)))
+        assert stream["labels"] == batch["aggregate"]["labels"], "streamed label counts differ from batch mode"
+        print(f"{n:>9,} {'batch':<10} {batch_seconds:>8.2f} {batch_peak:>9.1f}")
+        print(f"{n:>9,} {'stream':<10} {stream_seconds:>8.2f} {stream_peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_feedback_themes.py
+"""
+Time the clustering step of utils.feedback_themes: NumPy mini-batch k-means
+versus full-batch (Lloyd) k-means over every vector each iteration, on
+synthetic 384-dimensional embeddings (the size all-MiniLM-L6-v2 produces)
+drawn around known theme directions.
+
+Usage: python -m benchmarks.bench_feedback_themes [--entries 20000 100000] [--themes 8]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from utils.feedback_themes import _init_centers, assign, minibatch_kmeans
+
+DIMENSIONS = 384
+
+
+def _embeddings(n, themes, seed=7):
+    rng = np.random.default_rng(seed)
+    directions = rng.normal(size=(themes, DIMENSIONS))
+    truth = rng.integers(0, themes, n)
+    X = (directions[truth] / np.sqrt(DIMENSIONS) + rng.normal(scale=0.05, size=(n, DIMENSIONS))).astype("float32")
+    X /= np.linalg.norm(X, axis=1, keepdims=True)
+    return X, truth
+
+
+def lloyd_kmeans(X, k, iterations=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = _init_centers(X, np.ones(len(X)), k, rng)
+    for _ in range(iterations):
+        labels, _ = assign(X, centers)
+        for c in range(len(centers)):
+            members = X[labels == c]
+            if len(members):
+                centers[c] = members.mean(axis=0)
+        centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    return centers, *assign(X, centers)
+
+
+def _purity(labels, truth):
+    """Share of entries whose cluster's majority theme is their own theme."""
+    return sum(np.bincount(truth[labels == c]).max() for c in np.unique(labels)) / len(truth)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, nargs="+", default=[20_000, 100_000])
+    parser.add_argument("--themes", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'entries':>9} {'method':<12} {'seconds':>8} {'purity':>7} {'mean cos':>9}")
+    for n in args.entries:
+        X, truth = _embeddings(n, args.themes)
+        for name, fn in (("lloyd", lloyd_kmeans), ("mini-batch", minibatch_kmeans)):
+            start = time.perf_counter()
+            _, labels, similarity = fn(X, args.themes)
+            seconds = time.perf_counter() - start
+            print(f"{n:>9,} {name:<12} {seconds:>8.2f} {_purity(labels, truth):>7.3f} {similarity.mean():>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/bench_lead_fetch.py
+"""
+Compare the old serial page loop in scrape_leads with the concurrent fetch stage.
+
+Serves a few hundred synthetic pages from a local HTTP stand-in (with a small
+artificial latency per request) and times both paths over the same URL list.
+
+Usage: python -m benchmarks.bench_lead_fetch [--pages 300] [--latency-ms 40]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+# Start from a cold, throwaway response cache so both paths hit the network.
+os.environ.setdefault("HTTP_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "http_cache.db"))
+
+from tools.lead_scraper_tool import parse_page, iter_scraped_pages
+
+
+def _make_handler(latency):
+    class _PageHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            n = self.path.strip("/").split("/")[-1]
+            body = (
+                f"<html><body><h1>Venue {n}</h1>"
+                f"<p>Contact events{n}@venue{n}.example or call +1 555 010 {int(n) % 10000:04d}</p>"
+                "<p>" + "Lorem ipsum dolor sit amet. " * 40 + "</p></body></html>"
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return _PageHandler
+
+
+def serial_fetch(urls):
+    """The pre-existing loop: a fresh requests.get per page, one after another."""
+    results = []
+    for url in urls:
+        res = requests.get(url, timeout=8)
+        results.append(parse_page(url, res.text))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=40)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--per-host", type=int, default=8)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(args.latency_ms / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/page/{i}" for i in range(args.pages)]
+
+    try:
+        start = time.perf_counter()
+        serial = serial_fetch(urls)
+        serial_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        concurrent = list(iter_scraped_pages(urls, max_workers=args.workers, per_host=args.per_host))
+        concurrent_s = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    print(f"[BENCH] pages={args.pages} latency={args.latency_ms}ms")
+    print(f"[BENCH] serial:     {len(serial)} pages in {serial_s:.2f}s")
+    print(f"[BENCH] concurrent: {len(concurrent)} pages in {concurrent_s:.2f}s "
+          f"(workers={args.workers}, per_host={args.per_host})")
+    print(f"[BENCH] speedup: {serial_s / max(concurrent_s, 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
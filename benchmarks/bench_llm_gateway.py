@@ -0,0 +1,151 @@
+# benchmarks/bench_llm_gateway.py
+"""
+Exercise utils.llm_gateway against a local OpenAI-compatible stub server:
+
+  - retries: the stub answers 429, then 500, then 200; the call succeeds after
+    two jittered backoffs that stay within BACKOFF_BASE * 2 ** attempt,
+  - retry budget: with 2 retries left and a stub that always answers 500, the
+    call gives up after 1 + 2 requests even though MAX_RETRIES allows more,
+  - limiter: 12 calls through a 20/s bucket with a burst of 2 take at least
+    (12 - 2) / 20 s,
+  - cache: a repeated temperature-0 call is served without a request.
+
+The gateway's own lazy client is used, pointed at the stub via OPENAI_BASE_URL.
+Each check asserts its expectation and prints what it measured.
+
+Usage: python -m benchmarks.bench_llm_gateway
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+_tmp = tempfile.mkdtemp()
+os.environ["LLM_CACHE_PATH"] = os.path.join(_tmp, "llm_cache.db")
+os.environ["OPENAI_API_KEY"] = "bench"
+
+import openai
+
+from utils import llm_gateway, training_db
+
+training_db.DB_PATH = Path(_tmp) / "training.db"
+
+MODEL = "gpt-4o-mini"
+STATE = {"script": [], "default": 200, "requests": []}
+_state_lock = threading.Lock()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with _state_lock:
+            STATE["requests"].append(time.monotonic())
+            status = STATE["script"].pop(0) if STATE["script"] else STATE["default"]
+        if status == 200:
+            body = {
+                "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()),
+                "model": payload["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": "ok"}}],
+                "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6},
+            }
+        else:
+            body = {"error": {"message": f"stub {status}", "type": "stub_error", "code": None}}
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+def _reset(script=(), default=200, rate=1000.0, burst=1000, budget=llm_gateway.RETRY_BUDGET_MIN):
+    with _state_lock:
+        STATE.update(script=list(script), default=default, requests=[])
+    llm_gateway._bucket = llm_gateway.TokenBucket(rate, burst)
+    llm_gateway._budget = llm_gateway._RetryBudget()
+    llm_gateway._budget.balance = budget
+    for k in llm_gateway.stats:
+        llm_gateway.stats[k] = 0
+
+
+def _ask(text, **kwargs):
+    return llm_gateway.chat([{"role": "user", "content": text}], MODEL, caller="bench", **kwargs)
+
+
+def check_retries():
+    _reset(script=[429, 500, 200])
+    assert _ask("retry", cache=False) == "ok"
+    times = STATE["requests"]
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    assert len(times) == 3 and llm_gateway.stats["retries"] == 2, (len(times), llm_gateway.stats)
+    for attempt, gap in enumerate(gaps):
+        # jittered backoff: uniform in [0, BACKOFF_BASE * 2 ** attempt], plus request overhead
+        assert gap <= llm_gateway.BACKOFF_BASE * 2 ** attempt + 0.25, (attempt, gap)
+    print(f"[BENCH] retries: 429, 500, 200 -> ok after {len(times)} requests, "
+          f"backoff gaps {', '.join(f'{g * 1000:.0f}ms' for g in gaps)}")
+
+
+def check_budget():
+    _reset(default=500, budget=2)
+    llm_gateway.MAX_RETRIES = 10
+    try:
+        _ask("budget", cache=False)
+        raise AssertionError("expected the call to fail once the retry budget ran out")
+    except openai.InternalServerError:
+        pass
+    finally:
+        llm_gateway.MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+    requests = len(STATE["requests"])
+    assert requests == 3 and llm_gateway._budget.balance < 1, (requests, llm_gateway._budget.balance)
+    assert llm_gateway.stats["failures"] == 1, llm_gateway.stats
+    print(f"[BENCH] budget: always-500 stub, 2 retries in budget -> gave up after {requests} requests "
+          f"(MAX_RETRIES=10), balance {llm_gateway._budget.balance:.1f}")
+
+
+def check_limiter(calls=12, rate=20.0, burst=2):
+    _reset(rate=rate, burst=burst)
+    start = time.monotonic()
+    for i in range(calls):
+        _ask(f"pace {i}", cache=False)
+    elapsed = time.monotonic() - start
+    floor = (calls - burst) / rate
+    assert elapsed >= floor * 0.95, (elapsed, floor)
+    print(f"[BENCH] limiter: {calls} calls at {rate:.0f}/s, burst {burst} -> {elapsed:.2f}s (floor {floor:.2f}s)")
+
+
+def check_cache():
+    _reset()
+    first, second = _ask("cached question"), _ask("cached question")
+    requests = len(STATE["requests"])
+    assert first == second == "ok" and requests == 1, (requests, llm_gateway.stats)
+    assert llm_gateway.stats["cache_hits"] == 1, llm_gateway.stats
+    print(f"[BENCH] cache: 2 identical temperature-0 calls -> {requests} request, "
+          f"{llm_gateway.stats['cache_hits']} cache hit")
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    llm_gateway.BACKOFF_BASE = 0.05  # keep the run short; the bound checked scales with it
+    try:
+        check_retries()
+        check_budget()
+        check_limiter()
+        check_cache()
+    finally:
+        server.shutdown()
+    training_db.flush()
+    print(f"[BENCH] all gateway checks passed ({len(training_db.get_recent_runs(100))} calls recorded)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# benchmarks/bench_sheets_sync.py
+"""
+Count Sheets API requests for a lead upload: the old get_all_values +
+append_row-per-lead loop versus utils.sheets_sync.
+
+Uses an in-memory fake worksheet that implements the gspread calls we use,
+counts requests and the cells they transfer, and sleeps --latency-ms per
+request to stand in for the network round trip.
+
+Usage: python -m benchmarks.bench_sheets_sync [--existing 2000] [--leads 300] [--overlap 0.5]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault("SHEETS_SYNC_CACHE", os.path.join(_tmp, "sheets_sync.db"))
+
+from utils.google_sheets_uploader import HEADERS, lead_row
+from utils.sheets_sync import sync_rows
+
+
+class _FakeSpreadsheet:
+    id = "fake-spreadsheet"
+
+
+class FakeWorksheet:
+    spreadsheet = _FakeSpreadsheet()
+    id = 0
+
+    def __init__(self, rows, latency_ms):
+        self.rows = [list(r) for r in rows]
+        self.latency = latency_ms / 1000
+        self.requests = 0
+        self.cells = 0
+
+    def _request(self, cells):
+        self.requests += 1
+        self.cells += cells
+        time.sleep(self.latency)
+
+    def get_all_values(self):
+        self._request(sum(len(r) for r in self.rows))
+        return [list(r) for r in self.rows]
+
+    def get(self, range_str):
+        first, last = (int(part) for part in range_str.split(":"))
+        values = [list(r) for r in self.rows[first - 1:last]]
+        self._request(sum(len(r) for r in values))
+        return values
+
+    def append_row(self, row, value_input_option=None):
+        self._request(len(row))
+        self.rows.append(list(row))
+
+    def append_rows(self, rows, value_input_option=None):
+        self._request(sum(len(r) for r in rows))
+        self.rows.extend(list(r) for r in rows)
+
+
+def _lead(i):
+    return {"url": f"https://venue{i}.example.com", "emails": [f"info@venue{i}.example.com"],
+            "phones": [f"+1 555 {i:04d}"], "category": random.choice(["Hotel", "Event Venue", "Restaurant"])}
+
+
+def legacy_upload(worksheet, leads):
+    existing = worksheet.get_all_values()
+    if not existing:
+        worksheet.append_row(HEADERS)
+    for lead in leads:
+        row = lead_row(lead)
+        if row not in existing:
+            worksheet.append_row(row)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--existing", type=int, default=2000, help="rows already in the sheet")
+    parser.add_argument("--leads", type=int, default=300, help="leads in the upload")
+    parser.add_argument("--overlap", type=float, default=0.5, help="share of leads already in the sheet")
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    random.seed(7)
+    existing_leads = [_lead(i) for i in range(args.existing)]
+    base = [HEADERS] + [lead_row(lead) for lead in existing_leads]
+    n_old = int(args.leads * args.overlap)
+    upload = random.sample(existing_leads, n_old) + [_lead(args.existing + i) for i in range(args.leads - n_old)]
+
+    results = []
+    sheet = FakeWorksheet(base, args.latency_ms)
+    start = time.perf_counter()
+    legacy_upload(sheet, upload)
+    results.append(("append_row loop", sheet.requests, sheet.cells, time.perf_counter() - start, len(sheet.rows)))
+
+    sheet = FakeWorksheet(base, args.latency_ms)
+    for label in ("sync (cold cache)", "sync (warm cache)"):
+        before_requests, before_cells = sheet.requests, sheet.cells
+        start = time.perf_counter()
+        sync_rows(sheet, [lead_row(lead) for lead in upload], headers=HEADERS)
+        results.append((label, sheet.requests - before_requests, sheet.cells - before_cells,
+                        time.perf_counter() - start, len(sheet.rows)))
+        upload = upload + [_lead(10 ** 6 + i) for i in range(10)]  # next run brings a few new leads
+
+    print(f"{args.existing} existing rows, {args.leads} leads ({n_old} already present), "
+          f"{args.latency_ms:.0f} ms per request")
+    print(f"{'path':<20} {'requests':>9} {'cells moved':>12} {'seconds':>8} {'sheet rows':>11}")
+    for label, requests, cells, seconds, rows in results:
+        print(f"{label:<20} {requests:>9} {cells:>12} {seconds:>8.2f} {rows:>11}")
+
+
+if __name__ == "__main__":
+    main()
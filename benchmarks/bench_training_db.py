@@ -0,0 +1,83 @@
+# benchmarks/bench_training_db.py
+"""
+Inserts per second into the runs table from 8 threads: the previous
+connection-per-call, commit-per-row log_run versus the pooled WAL connection
+with the batched background writer.
+
+Usage: python -m benchmarks.bench_training_db [--threads 8] [--rows 2000]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from utils import training_db
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    agent TEXT, task TEXT, inputs TEXT, outputs TEXT, metrics TEXT, timestamp TEXT
+)
+"""
+
+
+def _old_log_run(path, agent, task, inputs, outputs, metrics=None):
+    """The pre-existing log_run: new connection, one insert, commit, close."""
+    conn = sqlite3.connect(path, timeout=30)
+    c = conn.cursor()
+    c.execute(
+        "INSERT INTO runs (agent, task, inputs, outputs, metrics, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+        (agent, task, json.dumps(inputs), json.dumps(outputs), json.dumps(metrics or {}), datetime.utcnow().isoformat())
+    )
+    conn.commit()
+    conn.close()
+
+
+def _hammer(fn, threads, rows):
+    def _worker(n):
+        for i in range(rows):
+            fn("bench_agent", f"task_{n}", {"i": i}, {"ok": True}, {"type": "chat", "tokens": 42})
+
+    workers = [threading.Thread(target=_worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=2000, help="rows per thread")
+    args = parser.parse_args()
+    total = args.threads * args.rows
+    tmp = tempfile.mkdtemp()
+
+    old_path = os.path.join(tmp, "old.db")
+    conn = sqlite3.connect(old_path)
+    conn.execute(_SCHEMA)
+    conn.close()
+    start = _hammer(lambda *a: _old_log_run(old_path, *a), args.threads, args.rows)
+    old_s = time.perf_counter() - start
+
+    training_db.DB_PATH = Path(tmp) / "new.db"
+    start = _hammer(training_db.log_run, args.threads, args.rows)
+    training_db.flush(timeout=None)
+    new_s = time.perf_counter() - start
+    stored = len(training_db.get_recent_runs(total + 1))
+
+    print(f"[BENCH] {args.threads} threads x {args.rows} rows")
+    print(f"[BENCH] before (connect/commit per row): {total / old_s:10.0f} inserts/s ({old_s:.2f}s)")
+    print(f"[BENCH] after  (WAL + batched writer):   {total / new_s:10.0f} inserts/s ({new_s:.2f}s, {stored} rows stored)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,21 @@
 # === dashboard.py ===
 import streamlit as st
 import subprocess
+from utils.cost_tracker import current_spend
 
 st.set_page_config(page_title="Echo Ops Dashboard", layout="wide")
 
 st.title("🌅 Echo Ops Dashboard")
 st.markdown("Monitor and launch the autonomous Echo Temple marketing crew")
 
+spend = current_spend()
+col1, col2, col3 = st.columns(3)
+col1.metric("Spend this month", f"${spend['month_to_date']:.2f}")
+col2.metric("Projected monthly", f"${spend['projected_monthly']:.2f}",
+            delta="over budget" if spend["over_budget"] else "within budget",
+            delta_color="inverse" if spend["over_budget"] else "normal")
+col3.metric("Monthly budget", f"${spend['budget_monthly']:.2f}")
+
 if st.button("Run CrewAI Marketing Team"):
     with st.spinner("Crew is running..."):
         result = subprocess.run(["python", "main.py"], capture_output=True, text=True)
@@ -1,72 +1,42 @@
 # main.py
-from crewai import Crew, Agent
-from tasks import (
-    build_semantic_index,
-    cost_monitor_task,
-    feedback_summary_task,
-    feedback_tasks,
-    follow_up_actions_task,
-    generate_leads,
-    lead_scraper_task,
-    optimize_code_task,
-    send_emails,
-    sentiment_analysis_task,
-    simulate_upcoming_campaign,
-    update_calendar,
-    update_docs,
-    write_email_task,
-    write_training_notes_task
-)
-from tools import (
-    cost_monitor_tool,
-    email_writer_tool,
-    generate_campaign_report_tool,
-    generate_feedback_summary_tool,
-    generate_follow_up_actions_tool,
-    generate_sentiment_analysis_tool,
-    google_sheets_interface,
-    lead_scraper_tool,
-    semantic_memory_tool,
-    write_training_notes_tool
-)
+import argparse
+
+# Task, tool and agent modules are imported inside main() through crew's lazy
+# discovery, so `python main.py --help` and --invalidate start without loading
+# crewai, the Google clients or the embedding model.
 
 def main():
-    # Define agents here (placeholder for your custom agents)
-    agent = Agent(name="Main Agent", role="Coordinator")
+    parser = argparse.ArgumentParser(description="Run the Echo Temple marketing crew.")
+    parser.add_argument("--parallel", action="store_true",
+                        help="run independent tasks concurrently (see crew.TASK_DEPENDENCIES)")
+    parser.add_argument("--workers", type=int, default=4, help="max concurrent tasks with --parallel")
+    parser.add_argument("--tasks", nargs="*", help="only run these tasks (with --parallel)")
+    parser.add_argument("--resume", action="store_true",
+                        help="replay stored outputs of tasks whose inputs are unchanged and that are within their TTL "
+                             "(crew.CHECKPOINT_TTL; implies --parallel)")
+    parser.add_argument("--invalidate", nargs="*", metavar="TASK",
+                        help="drop stored outputs for these tasks (all tasks if none given) before running")
+    args = parser.parse_args()
+    if args.tasks is not None and not (args.parallel or args.resume):
+        parser.error("--tasks only applies with --parallel (or --resume)")
+
+    if args.invalidate is not None:
+        from utils.checkpoints import CheckpointStore
+        removed = CheckpointStore().invalidate(args.invalidate or None)
+        print(f"Invalidated {removed} stored task output(s).")
+
+    if args.parallel or args.resume:
+        from crew import run_crew_parallel, tasks_map
+        unknown = [t for t in args.tasks or [] if t not in tasks_map]
+        if unknown:
+            parser.error(f"unknown task(s): {', '.join(unknown)}; available: {', '.join(tasks_map.keys())}")
+        report = run_crew_parallel(args.tasks, max_workers=args.workers, resume=args.resume)
+        print("Crew execution result:", report.results)
+        return
 
-    # Create the Crew
-    crew = Crew(
-        agents=[agent],
-        tasks=[
-            build_semantic_index,
-            cost_monitor_task,
-            feedback_summary_task,
-            feedback_tasks,
-            follow_up_actions_task,
-            generate_leads,
-            lead_scraper_task,
-            optimize_code_task,
-            send_emails,
-            sentiment_analysis_task,
-            simulate_upcoming_campaign,
-            update_calendar,
-            update_docs,
-            write_email_task,
-            write_training_notes_task
-        ],
-        tools=[
-            cost_monitor_tool,
-            email_writer_tool,
-            generate_campaign_report_tool,
-            generate_feedback_summary_tool,
-            generate_follow_up_actions_tool,
-            generate_sentiment_analysis_tool,
-            google_sheets_interface,
-            lead_scraper_tool,
-            semantic_memory_tool,
-            write_training_notes_tool
-        ]
-    )
+    # Build the crew from the discovered agents and tasks (imported on demand)
+    from crew import build_crew
+    crew = build_crew()
 
     # Kick things off
     result = crew.kickoff()
@@ -1,12 +1,13 @@
 # tasks/cost_monitor_task.py
 from crewai import Task
-from tools.cost_monitor_tool import cost_monitor_tool
+from tools.cost_monitor_tool import cost_monitor_tool, current_spend_tool
 from agents.strategist import strategist  # your existing strategist agent
 
 task = Task(
     description="Monitor API cost usage and trigger cost-saving measures if needed.",
     expected_output="Cost report and suggested actions.",
     agent=strategist,
+    tools=[cost_monitor_tool, current_spend_tool],
     async_execution=False
 )
 
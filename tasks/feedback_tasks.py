@@ -3,12 +3,14 @@
 Task wrappers for the feedback pipeline.
 Each Task wraps a single tool (summary -> sentiment -> follow-up actions).
 A chained list `feedback_analysis_chain` is provided for easy inclusion in the Crew.
+For large feedback exports, `feedback_batch_analysis_task` runs the whole chain in one step.
 """
 
 from crewai import Task
 from tools.generate_feedback_summary_tool import generate_feedback_summary_tool
 from tools.generate_sentiment_analysis_tool import generate_sentiment_analysis_tool
 from tools.generate_follow_up_actions_tool import generate_follow_up_actions_tool
+from tools.analyze_feedback_batch_tool import analyze_feedback_batch_tool
 
 # 1) Summarize raw feedback into a concise digest
 generate_feedback_summary_task = Task(
@@ -40,3 +42,11 @@ feedback_analysis_chain = [
     generate_sentiment_analysis_task,
     generate_follow_up_actions_task,
 ]
+
+# Batch mode: summary, sentiment and actions for thousands of entries in one call
+feedback_batch_analysis_task = Task(
+    name="Feedback Batch Analysis Task",
+    description="Run the feedback analysis chain over every entry of a feedback export and report the aggregate.",
+    tool=analyze_feedback_batch_tool,
+    expected_output="Entry and sentiment counts, a batch summary, overall sentiment and prioritized follow-up actions."
+)
@@ -1,29 +1,14 @@
 import os
-import json
 import datetime
 import subprocess
 from utils.semantic_index_builder import rebuild_semantic_index
+from utils.event_log import get_log
 
 # ======================
 # Logging Functions
 # ======================
 def log_optimizer_decision(decision_data):
-    os.makedirs("logs", exist_ok=True)
-    log_path = "logs/optimizer_decisions.json"
-
-    if os.path.exists(log_path):
-        with open(log_path, "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-            except json.JSONDecodeError:
-                data = []
-    else:
-        data = []
-
-    data.append(decision_data)
-
-    with open(log_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
+    get_log("optimizer_decisions").append(decision_data)
 
 def update_changelog(change_entry):
     changelog_path = "CHANGELOG.md"
@@ -0,0 +1,27 @@
+# tools/analyze_feedback_batch_tool.py
+"""
+Tool: analyze_feedback_batch_tool
+Runs the summary -> sentiment -> follow-up actions chain over a whole batch
+of feedback entries and returns one aggregate report.
+"""
+
+from crewai.tools import tool
+from typing import Iterable
+from utils.feedback_batch import analyze_feedback_batch, format_report
+
+def _analyze_feedback_batch(feedback_data: Iterable) -> str:
+    """
+    Accepts:
+      - feedback_data: list of strings (or dicts with 'text'), or a DataFrame with a 'text' column.
+
+    Returns:
+      - entry and sentiment counts, the batch summary, overall sentiment and recommended actions
+    """
+    if feedback_data is None:
+        return "No feedback data provided."
+    result = analyze_feedback_batch(feedback_data)
+    if not result["count"]:
+        return "No valid feedback entries."
+    return format_report(result)
+
+analyze_feedback_batch_tool = tool("analyze_feedback_batch_tool")(_analyze_feedback_batch)
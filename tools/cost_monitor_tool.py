@@ -3,15 +3,9 @@ from crewai.tools import tool
 import os
 import json
 from datetime import datetime, timedelta
-from utils.training_db import get_recent_runs
-
-# Basic pricing config (customize)
-PRICING = {
-    "openai_chat": 0.0003,   # USD per token estimate — set correct values
-    "openai_embed": 0.0001
-}
-# Budget thresholds
-BUDGET_MONTHLY_USD = float(os.getenv("BUDGET_MONTHLY_USD", "50.0"))
+from utils.training_db import aggregate_cost
+# Pricing and budget live with the rollups so writes are priced the same way
+from utils.cost_tracker import PRICING, DEFAULT_RUN_COST, BUDGET_MONTHLY_USD, current_spend
 
 def estimate_cost_from_runs(runs):
     # Basic heuristic: if run.metrics records tokens or api_cost, use it. Else fallback to naive per-run cost.
@@ -24,7 +18,7 @@ def estimate_cost_from_runs(runs):
             total += metrics["tokens"] * PRICING["openai_chat"]
         else:
             # small fixed cost per run
-            total += 0.001
+            total += DEFAULT_RUN_COST
     return total
 
 @tool("cost_monitor_tool")
@@ -32,13 +26,13 @@ def cost_monitor_tool(window_days: int = 30) -> str:
     """
     Analyze recent runs and estimate cost. Return suggested actions if threshold exceeded.
     """
-    all_runs = get_recent_runs(500)
     cutoff = datetime.utcnow() - timedelta(days=window_days)
-    recent = [r for r in all_runs if datetime.fromisoformat(r["timestamp"]) >= cutoff]
-    estimated = estimate_cost_from_runs(recent)
+    totals = aggregate_cost(cutoff, chat_token_price=PRICING["openai_chat"], default_run_cost=DEFAULT_RUN_COST)
+    estimated = totals["cost"]
 
-    # project monthly
-    projected_monthly = (estimated / max(1, window_days)) * 30
+    # project monthly from the month-to-date rollups (falls back to the window average)
+    spend = current_spend()
+    projected_monthly = spend["projected_monthly"] if spend["month_to_date"] else (estimated / max(1, window_days)) * 30
 
     actions = []
     if projected_monthly > BUDGET_MONTHLY_USD:
@@ -50,7 +44,17 @@ def cost_monitor_tool(window_days: int = 30) -> str:
 
     return json.dumps({
         "estimated_window_cost": estimated,
+        "window_runs": totals["runs"],
+        "window_tokens": totals["tokens"],
+        "month_to_date_cost": spend["month_to_date"],
         "projected_monthly_cost": projected_monthly,
         "budget_monthly": BUDGET_MONTHLY_USD,
         "suggested_actions": actions
     }, indent=2)
+
+@tool("current_spend_tool")
+def current_spend_tool() -> str:
+    """
+    Return month-to-date API spend, the projected monthly burn and the budget, read from the cost rollups.
+    """
+    return json.dumps(current_spend(), indent=2)
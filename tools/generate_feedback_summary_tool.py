@@ -2,10 +2,17 @@
 """
 Tool: generate_feedback_summary_tool
 Lightweight summary tool — replace with LLM later for richer summaries.
+Larger feedback sets are summarized as a ranked digest of embedding-based
+themes (utils.feedback_themes) instead of their first few entries.
 """
 
 from crewai.tools import tool
+from itertools import chain, islice
 from typing import Iterable
+from utils.event_log import get_log
+from utils.feedback_batch import summarize
+from utils.feedback_stream import iter_feedback
+from utils.feedback_themes import MIN_ENTRIES, extract_themes, format_themes
 
 def _generate_feedback_summary(feedback_data: Iterable) -> str:
     """
@@ -13,39 +20,37 @@ def _generate_feedback_summary(feedback_data: Iterable) -> str:
       - feedback_data: list of strings (or dicts with 'text') representing feedback entries.
 
     Returns:
-      - a concise summary string
+      - a ranked theme digest (size, sentiment, keywords, representative quote per
+        theme) for MIN_ENTRIES entries or more, else the first entries joined
     """
-    # Normalize inputs to strings
-    items = []
     if feedback_data is None:
         return "No feedback data provided."
 
-    try:
-        for entry in feedback_data:
-            if isinstance(entry, dict):
-                text = entry.get("text", "")
-            else:
-                text = str(entry)
-            text = text.strip()
-            if text:
-                items.append(text)
-    except TypeError:
-        # If a single string was provided rather than list
-        text = str(feedback_data).strip()
-        if text:
-            items = [text]
-
-    if not items:
+    # A single string or dict is one entry, not a sequence of entries
+    if isinstance(feedback_data, (str, dict)) or not hasattr(feedback_data, "__iter__"):
+        feedback_data = [feedback_data]
+
+    entries = iter_feedback(feedback_data)
+    head = list(islice(entries, MIN_ENTRIES))
+    if not head:
         return "No valid feedback entries."
 
-    # Simple heuristics: take top 3 entries and join
-    top = items[:3]
-    joined = " | ".join(top)
-    if len(joined) > 800:
-        joined = joined[:797] + "..."
+    if len(head) >= MIN_ENTRIES:
+        stats = {}
+        try:
+            themes = extract_themes(chain(head, entries), stats=stats)
+            return format_themes(themes, stats["entries"])
+        except Exception as e:
+            # Recorded so a missing model or a clustering bug shows up in the logs, not just stdout
+            get_log("feedback_themes").append({
+                "event": "theme_extraction_failed",
+                "error": f"{type(e).__name__}: {e}",
+                "entries": stats.get("entries"),
+            })
+            print(f"[FEEDBACK] Theme extraction unavailable, summarizing first entries: {e}")
 
-    summary = f"Feedback Summary (top {len(top)}): {joined}"
-    return summary
+    # Simple heuristics: take top 3 entries and join
+    return summarize(head, 3)
 
 # create tool instance (pattern that matches earlier test usage)
 generate_feedback_summary_tool = tool("generate_feedback_summary_tool")(_generate_feedback_summary)
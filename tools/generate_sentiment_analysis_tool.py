@@ -5,9 +5,7 @@ Rule-based sentiment detection (replaceable by LLM or NLP lib later).
 """
 
 from crewai.tools import tool
-
-POSITIVE = ["good", "great", "excellent", "amazing", "positive", "love", "wonderful", "clean"]
-NEGATIVE = ["bad", "poor", "terrible", "hate", "awful", "dirty", "noisy", "delay", "slow"]
+from utils.feedback_batch import format_sentiment, sentiment_counts
 
 def _generate_sentiment_analysis(feedback_summary: str) -> str:
     """
@@ -20,21 +18,8 @@ def _generate_sentiment_analysis(feedback_summary: str) -> str:
     if not feedback_summary:
         return "Neutral: no content to evaluate"
 
-    text = feedback_summary.lower()
-
-    pos_score = sum(text.count(w) for w in POSITIVE)
-    neg_score = sum(text.count(w) for w in NEGATIVE)
-
-    if pos_score > neg_score:
-        label = "Positive"
-        reason = f"Detected {pos_score} positive tokens vs {neg_score} negative tokens."
-    elif neg_score > pos_score:
-        label = "Negative"
-        reason = f"Detected {neg_score} negative tokens vs {pos_score} positive tokens."
-    else:
-        label = "Neutral"
-        reason = f"No clear positive/negative dominance ({pos_score} pos / {neg_score} neg)."
-
-    return f"{label}: {reason}"
+    # Shared lexicon with batch mode: substring count() per word, as before
+    pos_score, neg_score = sentiment_counts(feedback_summary)
+    return format_sentiment(pos_score, neg_score)
 
 generate_sentiment_analysis_tool = tool("generate_sentiment_analysis_tool")(_generate_sentiment_analysis)
@@ -1,6 +1,12 @@
 import gspread
+from contextlib import contextmanager
+from gspread.utils import rowcol_to_a1
 from oauth2client.service_account import ServiceAccountCredentials
-from typing import List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+from utils.sheets_sync import append_in_chunks, sync_rows
+
+# Ranges or find/replace requests sent per batch request
+BATCH_CHUNK = 500
 
 
 class GoogleSheetsInterface:
@@ -15,6 +21,7 @@ class GoogleSheetsInterface:
         self.sheet_name = sheet_name
         self.client = self._authorize()
         self.sheet = self.client.open(self.sheet_name).sheet1
+        self._buffer = None
 
     def _authorize(self):
         """Authorize with Google Sheets API."""
@@ -40,12 +47,21 @@ class GoogleSheetsInterface:
 
     def append_data(self, data: List[List[Any]]):
         """
-        Append rows to the sheet.
+        Append rows to the sheet, one request per chunk of rows.
 
         :param data: List of rows to append.
         """
-        for row in data:
-            self.sheet.append_row(row, value_input_option="USER_ENTERED")
+        append_in_chunks(self.sheet, [list(row) for row in data])
+
+    def sync_data(self, data: List[List[Any]], headers: Optional[List[Any]] = None) -> int:
+        """
+        Append only the rows that are not already in the sheet.
+
+        :param data: List of rows to sync.
+        :param headers: Header row written first if the sheet is empty.
+        :return: Number of rows written.
+        """
+        return sync_rows(self.sheet, data, headers=headers)
 
     def read_data(self, range_str: Optional[str] = None) -> List[List[Any]]:
         """
@@ -60,21 +76,150 @@ class GoogleSheetsInterface:
 
     def update_cell(self, row: int, col: int, value: Any):
         """
-        Update a specific cell.
+        Update a specific cell. Inside buffered(), the edit is queued instead.
 
         :param row: Row number (1-indexed).
         :param col: Column number (1-indexed).
         :param value: Value to set.
         """
+        if self._buffer is not None:
+            self._buffer.set(row, col, value)
+            return
         self.sheet.update_cell(row, col, value)
 
-    def find_and_replace(self, find_str: str, replace_str: str):
+    def find_and_replace(self, find_str: str, replace_str: str) -> int:
         """
         Find and replace all instances of a string in the sheet.
 
         :param find_str: String to find.
         :param replace_str: String to replace it with.
+        :return: Number of cells changed.
+        """
+        return self.batch_find_and_replace([(find_str, replace_str)])
+
+    def batch_find_and_replace(self, pairs: List[Tuple[str, str]], match_case: bool = True,
+                               match_entire_cell: bool = True) -> int:
+        """
+        Run many find/replace pairs server-side, one batchUpdate per chunk of pairs.
+
+        The defaults match the old findall + update_cell behaviour: a cell is
+        replaced when its whole value equals the search string.
+
+        :param pairs: (find, replace) tuples, applied in order.
+        :param match_case: Case-sensitive matching.
+        :param match_entire_cell: Only match cells whose entire value is the search string.
+        :return: Number of cells changed.
+        """
+        requests = [{
+            "findReplace": {
+                "find": find_str,
+                "replacement": replace_str,
+                "matchCase": match_case,
+                "matchEntireCell": match_entire_cell,
+                "sheetId": self.sheet.id,
+            }
+        } for find_str, replace_str in pairs]
+        changed = 0
+        for i in range(0, len(requests), BATCH_CHUNK):
+            response = self.sheet.spreadsheet.batch_update({"requests": requests[i:i + BATCH_CHUNK]})
+            for reply in response.get("replies", []):
+                changed += reply.get("findReplace", {}).get("occurrencesChanged", 0)
+        return changed
+
+    def batch_update_ranges(self, updates: Dict[str, List[List[Any]]],
+                            value_input_option: str = "USER_ENTERED") -> int:
+        """
+        Write many ranges, one values.batchUpdate per chunk of ranges.
+
+        :param updates: Mapping of A1 range (e.g. 'B2:C3') to the rows of values to write there.
+        :param value_input_option: How Sheets interprets the values.
+        :return: Number of requests sent.
+        """
+        data = [{"range": range_str, "values": values} for range_str, values in updates.items()]
+        requests = 0
+        for i in range(0, len(data), BATCH_CHUNK):
+            self.sheet.batch_update(data[i:i + BATCH_CHUNK], value_input_option=value_input_option)
+            requests += 1
+        return requests
+
+    def batch_update_cells(self, cells: Dict[Tuple[int, int], Any]) -> int:
+        """
+        Write many cells; runs of adjacent cells in a row are sent as one range.
+
+        :param cells: Mapping of (row, col), 1-indexed, to value.
+        :return: Number of requests sent.
         """
-        cell_list = self.sheet.findall(find_str)
-        for cell in cell_list:
-            self.sheet.update_cell(cell.row, cell.col, replace_str)
+        return self.batch_update_ranges(_cell_ranges(cells)) if cells else 0
+
+    def batch_read(self, ranges: List[str]) -> List[List[List[Any]]]:
+        """
+        Read many ranges, one values.batchGet per chunk of ranges.
+
+        :param ranges: A1 ranges to read.
+        :return: The rows of each range, in the order given.
+        """
+        results = []
+        for i in range(0, len(ranges), BATCH_CHUNK):
+            results.extend(self.sheet.batch_get(ranges[i:i + BATCH_CHUNK]))
+        return [list(values) for values in results]
+
+    @contextmanager
+    def buffered(self):
+        """
+        Queue update_cell edits and write them in one batch when the block exits.
+
+        Later edits to the same cell replace earlier ones. Nested blocks share
+        the outer buffer, which flushes once.
+        """
+        if self._buffer is not None:
+            yield self._buffer
+            return
+        self._buffer = CellBuffer(self)
+        try:
+            yield self._buffer
+        finally:
+            buffer, self._buffer = self._buffer, None
+            buffer.flush()
+
+
+class CellBuffer:
+    """Write-behind buffer of cell edits for a GoogleSheetsInterface."""
+
+    def __init__(self, interface: GoogleSheetsInterface):
+        self.interface = interface
+        self.cells: Dict[Tuple[int, int], Any] = {}
+
+    def set(self, row: int, col: int, value: Any):
+        self.cells[(row, col)] = value
+
+    def __len__(self):
+        return len(self.cells)
+
+    def flush(self) -> int:
+        """Send the queued edits; returns the number of requests."""
+        if not self.cells:
+            return 0
+        cells, self.cells = self.cells, {}
+        return self.interface.batch_update_cells(cells)
+
+
+def _cell_ranges(cells: Dict[Tuple[int, int], Any]) -> Dict[str, List[List[Any]]]:
+    """Group (row, col) -> value into one-row ranges of consecutive columns."""
+    ranges = {}
+    run_start, run_values, previous = None, [], None
+    for (row, col) in sorted(cells):
+        if previous is not None and (row, col) != (previous[0], previous[1] + 1):
+            ranges[_a1_span(run_start, previous)] = [run_values]
+            run_start, run_values = None, []
+        if run_start is None:
+            run_start = (row, col)
+        run_values.append(cells[(row, col)])
+        previous = (row, col)
+    if run_start is not None:
+        ranges[_a1_span(run_start, previous)] = [run_values]
+    return ranges
+
+
+def _a1_span(start: Tuple[int, int], end: Tuple[int, int]) -> str:
+    first = rowcol_to_a1(*start)
+    return first if start == end else f"{first}:{rowcol_to_a1(*end)}"
@@ -2,15 +2,20 @@
 
 import os
 import re
+import threading
 import requests
-import pandas as pd
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 from bs4 import BeautifulSoup
 from crewai.tools import tool
-from tools.google_sheets_interface import GoogleSheetsInterface
+from utils.google_sheets_uploader import upload_to_sheet
+from utils.http_cache import get_http_cache
+from utils.lead_categorizer import BATCH_SIZE as CATEGORIZE_BATCH, categorize_leads
 
-from tools.semantic_memory_tool import semantic_store
-from openai import OpenAI
+from tools.semantic_memory_tool import get_memory
 
 # Load environment variables
 load_dotenv()
@@ -20,7 +25,29 @@ GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID")
 SHEET_ID = os.getenv("GOOGLE_SHEET_ID")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+# Fetch stage limits (global worker pool and simultaneous requests per host)
+SCRAPE_MAX_WORKERS = int(os.getenv("SCRAPE_MAX_WORKERS", "16"))
+SCRAPE_PER_HOST = int(os.getenv("SCRAPE_PER_HOST", "4"))
+SCRAPE_TIMEOUT = float(os.getenv("SCRAPE_TIMEOUT", "8"))
+# Search results are reused for a day; pages fall back to the cache default TTL
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", str(24 * 3600)))
+
+# ===== HTTP Session ===== #
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Return the shared keep-alive session, sized to the fetch worker pool."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=SCRAPE_MAX_WORKERS, pool_maxsize=SCRAPE_MAX_WORKERS)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
 
 # ===== Helper Functions ===== #
 
@@ -36,7 +63,7 @@ def google_search(query, num_results=5):
         "q": query,
         "num": num_results
     }
-    res = requests.get(url, params=params)
+    res = get_http_cache().get(get_session(), url, params=params, ttl=SEARCH_CACHE_TTL)
     if res.status_code == 200:
         data = res.json()
         return [item['link'] for item in data.get("items", [])]
@@ -44,47 +71,69 @@ def google_search(query, num_results=5):
         print(f"[ERROR] Google Search API: {res.text}")
         return []
 
-def scrape_with_bsoup(url):
+def parse_page(url, html):
+    """Extract contact details and a text snippet from a fetched page."""
+    soup = BeautifulSoup(html, "html.parser")
+    text = soup.get_text()
+
+    emails = list(set(re.findall(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-z]{2,}", text)))
+    phones = list(set(re.findall(r"\+?\d[\d\s().-]{7,}\d", text)))
+
+    return {
+        "url": url,
+        "emails": emails,
+        "phones": phones,
+        "raw_text": text[:5000]  # store snippet for context
+    }
+
+def scrape_with_bsoup(url, session=None):
     """Scrape a page with BeautifulSoup to find contact details."""
     try:
-        res = requests.get(url, timeout=8)
-        soup = BeautifulSoup(res.text, "html.parser")
-        text = soup.get_text()
-
-        emails = list(set(re.findall(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-z]{2,}", text)))
-        phones = list(set(re.findall(r"\+?\d[\d\s().-]{7,}\d", text)))
-
-        return {
-            "url": url,
-            "emails": emails,
-            "phones": phones,
-            "raw_text": text[:5000]  # store snippet for context
-        }
+        res = get_http_cache().get(session or get_session(), url, timeout=SCRAPE_TIMEOUT)
+        return parse_page(url, res.text)
     except Exception as e:
         print(f"[ERROR] BSoup scrape failed for {url}: {e}")
         return None
 
-def categorize_lead(text_snippet):
-    """Use GPT to categorize the lead into type (venue, restaurant, etc.)."""
-    try:
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "Classify the business type in one or two words."},
-                {"role": "user", "content": text_snippet}
-            ]
-        )
-        return resp.choices[0].message.content.strip()
-    except Exception as e:
-        print(f"[WARN] Classification failed: {e}")
-        return "Unknown"
+def iter_scraped_pages(urls, max_workers=None, per_host=None, session=None):
+    """
+    Fetch and parse pages concurrently, yielding each result as soon as it arrives.
+
+    max_workers caps the total number of requests in flight; per_host caps how many
+    of those may target the same host at once. Failed pages are skipped.
+    """
+    max_workers = max_workers or SCRAPE_MAX_WORKERS
+    per_host = per_host or SCRAPE_PER_HOST
+    session = session or get_session()
+    host_slots = defaultdict(lambda: threading.BoundedSemaphore(per_host))
+    slots_lock = threading.Lock()
+
+    def _fetch(url):
+        with slots_lock:
+            slot = host_slots[urlparse(url).netloc]
+        with slot:
+            return scrape_with_bsoup(url, session=session)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_fetch, url) for url in dict.fromkeys(urls)]
+        for future in as_completed(futures):
+            data = future.result()
+            if data:
+                yield data
+
+def categorize_lead(text_snippet, url=""):
+    """Categorize a single lead into a business type (venue, restaurant, etc.)."""
+    return categorize_leads([{"url": url, "raw_text": text_snippet}])[0]
+
+def _lead_key(lead):
+    return tuple(sorted(lead.get("emails", []))) + (lead.get("url"),)
 
 def deduplicate_leads(leads):
     """Remove duplicate leads by email or URL."""
     seen = set()
     unique = []
     for lead in leads:
-        key = tuple(sorted(lead.get("emails", []))) + (lead.get("url"),)
+        key = _lead_key(lead)
         if key not in seen:
             seen.add(key)
             unique.append(lead)
@@ -103,27 +152,44 @@ def scrape_leads(query: str) -> str:
     # Step 1: Search via Google API
     urls = google_search(query)
 
-    # Step 2: Fallback or supplement with BeautifulSoup scraping
-    scraped_data = []
-    for url in urls:
-        data = scrape_with_bsoup(url)
-        if data:
-            data["category"] = categorize_lead(data["raw_text"])
-            scraped_data.append(data)
-
-    # Step 3: Deduplicate
-    unique_leads = deduplicate_leads(scraped_data)
+    # Step 2: Fetch pages concurrently; deduplicate as they arrive
+    # Step 3: Categorize (keyword rules, then memo, then batched model calls) in
+    # batches as pages arrive, so model requests overlap the remaining fetches
+    seen = set()
+    unique_leads = []
+    uncategorized = []
+    stats = {}
+
+    def _categorize(batch):
+        for lead, category in zip(batch, categorize_leads(batch, stats=stats)):
+            lead["category"] = category
+        batch.clear()
+
+    for data in iter_scraped_pages(urls):
+        key = _lead_key(data)
+        if key in seen:
+            continue
+        seen.add(key)
+        unique_leads.append(data)
+        uncategorized.append(data)
+        if len(uncategorized) >= CATEGORIZE_BATCH:
+            _categorize(uncategorized)
+    if uncategorized:
+        _categorize(uncategorized)
+    if unique_leads:
+        print(f"[INFO] Categorized {len(unique_leads)} leads: {stats['local']} local, "
+              f"{stats['memo']} memoized, {stats['llm']} via {stats['requests']} model requests.")
 
     # Step 4: Store in Google Sheet
     upload_to_sheet(unique_leads, SHEET_ID)
 
-    # Step 5: Store in semantic memory
-    for lead in unique_leads:
-        semantic_store(
-            text=f"{lead['url']} | {', '.join(lead['emails'])} | {', '.join(lead['phones'])} | {lead['category']}",
-            metadata={"source": lead["url"], "category": lead["category"]}
-        )
+    # Step 5: Store in semantic memory (one embedding call, appended to the index)
+    get_memory().add(
+        [f"{lead['url']} | {', '.join(lead['emails'])} | {', '.join(lead['phones'])} | {lead['category']}"
+         for lead in unique_leads],
+        [{"source": lead["url"], "category": lead["category"]} for lead in unique_leads]
+    )
 
+    print(f"[CACHE] {get_http_cache().summary()}")
     print(f"[SUCCESS] {len(unique_leads)} leads scraped and stored.")
     return f"Scraped and stored {len(unique_leads)} leads."
-
@@ -1,23 +1,28 @@
 import os
-import faiss
-import pandas as pd
+import json
+import hashlib
+import threading
 import numpy as np
-from openai import OpenAI
 from dotenv import load_dotenv
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from utils.embedding_cache import embed_cached
+from utils import llm_gateway
 
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 google_sheets_interface = os.getenv("google_sheets_interface")
-INDEX_PATH = "logs/lead_embeddings.index"
 EMBEDDING_MODEL = "text-embedding-3-small"
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+# Append-only storage: raw float32 rows plus one JSON line per row (same order).
+# The first metadata line is a header recording the vector dimension and model.
+VECTORS_PATH = "logs/lead_vectors.f32"
+METADATA_PATH = "logs/lead_metadata.jsonl"
 
 def _load_google_sheet(sheet_name="Leads"):
     """Load leads from Google Sheet into DataFrame."""
+    import gspread
+    import pandas as pd
+    from oauth2client.service_account import ServiceAccountCredentials
     scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
     creds = ServiceAccountCredentials.from_json_keyfile_name("google_service_account.json", scope)
     gc = gspread.authorize(creds)
@@ -25,40 +30,185 @@ def _load_google_sheet(sheet_name="Leads"):
     data = sheet.get_all_records()
     return pd.DataFrame(data)
 
-def _create_embeddings(df):
-    """Create embeddings for each row's combined text."""
-    texts = df.apply(lambda row: " | ".join(map(str, row.values)), axis=1).tolist()
-    response = client.embeddings.create(model=EMBEDDING_MODEL, input=texts)
-    vectors = np.array([r.embedding for r in response.data]).astype("float32")
-    return vectors
+def _embed_batch(texts):
+    return llm_gateway.embed(texts, EMBEDDING_MODEL, caller="semantic_memory")
 
-def _save_index(vectors, df):
-    """Save FAISS index to disk."""
-    index = faiss.IndexFlatL2(vectors.shape[1])
-    index.add(vectors)
-    faiss.write_index(index, INDEX_PATH)
-    df.to_csv("logs/lead_data.csv", index=False)  # Keep ID mapping
+def _create_embeddings(texts):
+    """Embed a list of texts, reusing cached vectors and batching the rest."""
+    return embed_cached(texts, EMBEDDING_MODEL, _embed_batch)
+
+def _text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SemanticMemory:
+    """
+    Long-lived lead memory backed by a FAISS IndexIDMap.
+
+    Vectors and metadata are appended to disk as they are added, so persisting
+    new leads never re-embeds or rewrites existing ones. Load once per process
+    through get_memory().
+    """
+
+    def __init__(self, vectors_path=VECTORS_PATH, metadata_path=METADATA_PATH):
+        self.vectors_path = vectors_path
+        self.metadata_path = metadata_path
+        self.dim = None
+        self.index = None
+        self.records = {}      # id -> {"text": ..., "metadata": {...}}
+        self._by_hash = {}     # text hash -> id, to skip re-adding known texts
+        self._next_id = 0
+        self._lock = threading.RLock()
+        self._load()
+
+    def __len__(self):
+        return len(self.records)
+
+    def _new_index(self, dim):
+        import faiss
+        self.dim = dim
+        self.index = faiss.IndexIDMap(faiss.IndexFlatL2(dim))
+
+    def _load(self):
+        if not os.path.exists(self.metadata_path):
+            return
+        rows, ends = [], []
+        with open(self.metadata_path, "rb") as f:
+            try:
+                header = json.loads(f.readline() or b"{}")
+            except ValueError:
+                return  # torn header: add() starts the files over
+            if not header.get("dim"):
+                return
+            header_end = end = f.tell()
+            for line in f:
+                # A crash mid-append can leave a torn last line; stop at the first bad one
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    row = json.loads(line)
+                    row["id"], row["text"]
+                except (ValueError, TypeError, KeyError):
+                    break
+                end += len(line)
+                rows.append(row)
+                ends.append(end)
+
+        dim = header["dim"]
+        vectors = np.fromfile(self.vectors_path, dtype="float32") if os.path.exists(self.vectors_path) else np.empty(0, "float32")
+        vectors = vectors[: (vectors.size // dim) * dim].reshape(-1, dim)
+        # A crash between the two appends can leave one side longer; keep the
+        # common prefix and cut both files back to it, so later appends line up
+        n = min(len(rows), len(vectors))
+        rows, vectors = rows[:n], vectors[:n]
+        with open(self.metadata_path, "r+b") as f:
+            f.truncate(ends[n - 1] if n else header_end)
+        if os.path.exists(self.vectors_path):
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(n * dim * vectors.itemsize)
+        else:
+            open(self.vectors_path, "wb").close()
+
+        self._new_index(dim)
+        if n:
+            ids = np.array([r["id"] for r in rows], dtype="int64")
+            self.index.add_with_ids(vectors, ids)
+        for r in rows:
+            self.records[r["id"]] = {"text": r["text"], "metadata": r.get("metadata", {})}
+            self._by_hash[_text_hash(r["text"])] = r["id"]
+        # Ids are handed out sequentially, so after truncation the next one is the row count
+        self._next_id = n
+
+    def add(self, texts, metadata=None):
+        """
+        Embed and store texts that are not already in memory. Returns the ids of
+        all given texts (existing ids for known texts).
+        """
+        texts = list(texts)
+        metadata = list(metadata) if metadata is not None else [{} for _ in texts]
+        with self._lock:
+            fresh = {}
+            for text, meta in zip(texts, metadata):
+                h = _text_hash(text)
+                if h not in self._by_hash and h not in fresh:
+                    fresh[h] = (text, meta)
+
+            if fresh:
+                new_texts = [t for t, _ in fresh.values()]
+                vectors = _create_embeddings(new_texts)
+                if self.index is None:
+                    self._new_index(vectors.shape[1])
+                    os.makedirs(os.path.dirname(self.metadata_path) or ".", exist_ok=True)
+                    with open(self.metadata_path, "w", encoding="utf-8") as f:
+                        f.write(json.dumps({"dim": self.dim, "model": EMBEDDING_MODEL}) + "\n")
+                    open(self.vectors_path, "wb").close()
+
+                ids = np.arange(self._next_id, self._next_id + len(new_texts), dtype="int64")
+                self._next_id += len(new_texts)
+                self.index.add_with_ids(vectors, ids)
+
+                with open(self.vectors_path, "ab") as f:
+                    vectors.tofile(f)
+                with open(self.metadata_path, "a", encoding="utf-8") as f:
+                    for new_id, (h, (text, meta)) in zip(ids.tolist(), fresh.items()):
+                        self.records[new_id] = {"text": text, "metadata": meta}
+                        self._by_hash[h] = new_id
+                        f.write(json.dumps({"id": new_id, "text": text, "metadata": meta}, default=str) + "\n")
+
+            return [self._by_hash[_text_hash(t)] for t in texts]
+
+    def search(self, query, k=5):
+        """Return the k closest stored entries for a natural language query."""
+        return self.search_batch([query], k)[0]
+
+    def search_batch(self, queries, k=5):
+        """Search several queries with one embedding call and one FAISS search."""
+        queries = list(queries)
+        if not queries or self.index is None or not self.records:
+            return [[] for _ in queries]
+        vectors = _create_embeddings(queries)
+        with self._lock:
+            D, I = self.index.search(vectors, min(k, len(self.records)))
+            results = []
+            for dists, ids in zip(D, I):
+                hits = []
+                for dist, i in zip(dists.tolist(), ids.tolist()):
+                    if i < 0:
+                        continue
+                    rec = self.records[i]
+                    hits.append({"id": i, "text": rec["text"], "distance": dist, **rec["metadata"]})
+                results.append(hits)
+            return results
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+def get_memory():
+    """Return the process-wide SemanticMemory, loading it on first use."""
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = SemanticMemory()
+        return _memory
+
+def semantic_store(text, metadata=None):
+    """Store a single text (with optional metadata) in semantic memory."""
+    return get_memory().add([text], [metadata or {}])[0]
 
 def build_semantic_index():
-    """Build or rebuild the semantic index from the Google Sheet."""
+    """Add any Google Sheet leads not yet in semantic memory (existing rows are not re-embedded)."""
     df = _load_google_sheet()
-    vectors = _create_embeddings(df)
-    _save_index(vectors, df)
-    print(f"Semantic index built with {len(df)} leads.")
+    records = df.to_dict(orient="records")
+    texts = [" | ".join(map(str, row.values())) for row in records]
+    memory = get_memory()
+    before = len(memory)
+    memory.add(texts, records)
+    print(f"Semantic index updated: {len(memory) - before} new of {len(df)} leads.")
 
 def semantic_query(query, k=5):
     """Search the semantic index with natural language query."""
-    if not os.path.exists(INDEX_PATH):
+    memory = get_memory()
+    if not len(memory):
         build_semantic_index()
-
-    index = faiss.read_index(INDEX_PATH)
-    df = pd.read_csv("logs/lead_data.csv")
-
-    # Embed query
-    query_vec = np.array(
-        client.embeddings.create(model=EMBEDDING_MODEL, input=[query]).data[0].embedding
-    ).astype("float32").reshape(1, -1)
-
-    D, I = index.search(query_vec, k)
-    results = df.iloc[I[0]]
-    return results.to_dict(orient="records")
+    return memory.search(query, k)
@@ -1,10 +1,9 @@
 from crewai.tools import tool
-from openai import OpenAI
-from utils.google_docs_uploader import upload_to_gdoc, fetch_recent_notes  # Ensure these exist
+from utils import llm_gateway, notes_memory
+from utils.event_log import get_log
+from utils.google_docs_uploader import upload_to_gdoc, fetch_recent_notes
 import os
-import json
 from datetime import datetime
-from pathlib import Path
 
 @tool("write_training_notes")
 def write_training_notes(data: dict) -> str:
@@ -25,7 +24,6 @@ def write_training_notes(data: dict) -> str:
     if not api_key:
         return "❌ Missing OpenAI API key"
 
-    client = OpenAI(api_key=api_key)
     now = datetime.now()
     timestamp = now.strftime("%Y-%m-%d_%H-%M")
     short_date = now.strftime("%Y-%m-%d")
@@ -34,9 +32,16 @@ def write_training_notes(data: dict) -> str:
     feedback = data.get("feedback", "")
     context = data.get("context", "")
 
-    # --- Memory Injection ---
-    past_notes = fetch_recent_notes(limit=2)  # You define this function to pull content from past notes
-    past_summary = "\n---\n".join(past_notes) if past_notes else "N/A"
+    # --- Memory Injection (token-budgeted digests of earlier notes) ---
+    if notes_memory.is_empty():
+        # First run with the digest store: seed it from the latest docs
+        try:
+            for note in reversed(fetch_recent_notes(limit=2)):
+                notes_memory.record_note("General", note)
+        except Exception as e:
+            print(f"[MEMORY] Could not seed notes memory from recent docs: {e}")
+    past_summary, memory_report = notes_memory.build_memory(f"{feedback}\n{context}", campaign, baseline_notes=2)
+    past_summary = past_summary or "N/A"
 
     # --- Prompt ---
     prompt = f"""
@@ -69,14 +74,13 @@ Structure:
 - Friendly but professional tone
 """
 
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[{"role": "user", "content": prompt}],
+    training_notes = llm_gateway.chat(
+        [{"role": "user", "content": prompt}],
+        "gpt-4",
+        caller="write_training_notes",
         temperature=0.7
     )
 
-    training_notes = response.choices[0].message.content
-
     # --- GDoc Title & Upload ---
     gdoc_title = f"{campaign} Training Notes - {short_date} ({timestamp})"
     doc_url = upload_to_gdoc(gdoc_title, training_notes)
@@ -87,22 +91,19 @@ Structure:
         "timestamp": timestamp,
         "campaign": campaign,
         "gdoc_url": doc_url,
-        "feedback_snippet": feedback[:250]
+        "feedback_snippet": feedback[:250],
+        "memory_tokens": memory_report["memory_tokens"],
+        "memory_baseline_tokens": memory_report["baseline_tokens"],
+        "memory_tokens_saved": memory_report["saved_tokens"]
     }
 
-    log_path = Path("logs/training_notes_log.json")
-    log_path.parent.mkdir(parents=True, exist_ok=True)
-
-    if log_path.exists():
-        with open(log_path, "r", encoding="utf-8") as f:
-            logs = json.load(f)
-    else:
-        logs = []
-
-    logs.append(log_entry)
+    get_log("training_notes").append(log_entry)
 
-    with open(log_path, "w", encoding="utf-8") as f:
-        json.dump(logs, f, indent=2)
+    # Fold the note into memory last: the doc and its log entry exist even if this fails
+    try:
+        notes_memory.record_note(campaign, training_notes)
+    except Exception as e:
+        print(f"[MEMORY] Could not add {gdoc_title} to notes memory: {e}")
 
     return f"✅ Training notes generated, uploaded, and logged:\n📄 {gdoc_title}\n🔗 {doc_url}"
 
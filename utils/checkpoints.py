@@ -0,0 +1,96 @@
+# utils/checkpoints.py
+"""
+Stored task outputs for resuming crew runs.
+
+Each output is keyed by task name and a fingerprint of everything that feeds
+the task: its description, expected output, agent, tools, and the outputs of
+the tasks it depends on. With resume enabled, a task whose fingerprint matches
+a stored row is skipped and its output replayed. Changing any input, or
+invalidating the task explicitly, makes it run again. Since a re-run output
+changes the fingerprint of its dependents, they re-run as well.
+
+Stored outputs also expire: a task that pulls live data (scraped leads, sheet
+rows, spend) hashes the same every run, so without a TTL it would be replayed
+forever. get() ignores rows older than the task's TTL.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+CHECKPOINT_PATH = Path("logs/checkpoints.db")
+DEFAULT_TTL = float(os.getenv("CHECKPOINT_TTL", str(24 * 3600)))  # seconds
+
+
+def task_fingerprint(name, task, dep_outputs=None, inputs=None):
+    """Hash of a task's definition plus the outputs it consumes."""
+    agent = getattr(task, "agent", None)
+    payload = {
+        "name": name,
+        "description": getattr(task, "description", None),
+        "expected_output": getattr(task, "expected_output", None),
+        "agent": getattr(agent, "role", None),
+        "tools": sorted(getattr(t, "name", str(t)) for t in (getattr(task, "tools", None) or [])),
+        "deps": {k: str(v) for k, v in sorted((dep_outputs or {}).items())},
+        "inputs": inputs or {},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class CheckpointStore:
+    def __init__(self, path=CHECKPOINT_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS checkpoints (
+            task TEXT,
+            input_hash TEXT,
+            output TEXT,
+            created_at TEXT,
+            PRIMARY KEY (task, input_hash)
+        )
+        """)
+        self._conn.commit()
+
+    def get(self, task, input_hash, ttl=DEFAULT_TTL):
+        """Return the stored output if it is younger than ttl seconds (None: never expires), else None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT output, created_at FROM checkpoints WHERE task = ? AND input_hash = ?", (task, input_hash)
+            ).fetchone()
+        if row is None:
+            return None
+        if ttl is not None and datetime.fromisoformat(row[1]) < datetime.utcnow() - timedelta(seconds=ttl):
+            return None
+        return json.loads(row[0])
+
+    def put(self, task, input_hash, output):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)",
+                (task, input_hash, json.dumps(output, default=str), datetime.utcnow().isoformat())
+            )
+            self._conn.commit()
+
+    def invalidate(self, tasks=None):
+        """Delete stored outputs for the given task names (all tasks if None). Returns rows removed."""
+        with self._lock:
+            if tasks is None:
+                cur = self._conn.execute("DELETE FROM checkpoints")
+            else:
+                tasks = list(tasks)
+                marks = ",".join("?" * len(tasks))
+                cur = self._conn.execute(f"DELETE FROM checkpoints WHERE task IN ({marks})", tasks)
+            self._conn.commit()
+            return cur.rowcount
+
+    def list(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT task, input_hash, created_at FROM checkpoints ORDER BY created_at"
+            ).fetchall()
@@ -0,0 +1,152 @@
+# utils/cost_tracker.py
+"""
+Pricing, cost rollups and the in-process budget watcher.
+
+training_db's writer prices every run as it is committed, adds it to the
+hourly/daily cost_rollups table, and passes the batch cost to the watcher
+here. The watcher keeps the month-to-date spend in memory and fires alerts
+when the projected monthly burn crosses BUDGET_MONTHLY_USD.
+"""
+
+import calendar
+import os
+import threading
+from datetime import datetime
+
+# Basic pricing config (customize)
+PRICING = {
+    "openai_chat": 0.0003,   # USD per token estimate — set correct values
+    "openai_embed": 0.0001
+}
+# Fallback cost for runs that record neither api_cost nor chat tokens
+DEFAULT_RUN_COST = 0.001
+# Budget thresholds
+BUDGET_MONTHLY_USD = float(os.getenv("BUDGET_MONTHLY_USD", "50.0"))
+
+
+def run_cost(run_type, tokens, api_cost):
+    """Estimated USD cost of one run (same rule as cost_monitor_tool.estimate_cost_from_runs)."""
+    if api_cost is not None:
+        return float(api_cost)
+    if tokens is not None and run_type == "chat":
+        return tokens * PRICING["openai_chat"]
+    return DEFAULT_RUN_COST
+
+
+def _month_key(now):
+    return now.strftime("%Y-%m")
+
+
+def project_monthly(month_spend, now):
+    """Project month-to-date spend over the whole month (at least one elapsed day assumed)."""
+    days_in_month = calendar.monthrange(now.year, now.month)[1]
+    elapsed_days = max(1.0, (now.day - 1) + now.hour / 24 + now.minute / 1440)
+    return month_spend / elapsed_days * days_in_month
+
+
+class BudgetWatcher:
+    def __init__(self, budget=BUDGET_MONTHLY_USD):
+        self.budget = budget
+        self.month = None
+        self.month_spend = 0.0
+        self.alerting = False
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def on_alert(self, callback):
+        """Register callback(snapshot_dict), called when the projection crosses the budget."""
+        self._callbacks.append(callback)
+
+    def seed(self, conn):
+        """Load month-to-date spend from the daily rollups (called by the writer thread when it opens the db)."""
+        now = datetime.utcnow()
+        row = conn.execute(
+            "SELECT COALESCE(SUM(cost), 0) FROM cost_rollups WHERE granularity = 'day' AND bucket >= ?",
+            (now.strftime("%Y-%m-01"),)
+        ).fetchone()
+        with self._lock:
+            self.month = _month_key(now)
+            self.month_spend = float(row[0])
+
+    def add(self, cost, now=None):
+        """Account for newly committed spend and fire alerts on an upward budget crossing."""
+        now = now or datetime.utcnow()
+        with self._lock:
+            if self.month != _month_key(now):
+                self.month, self.month_spend, self.alerting = _month_key(now), 0.0, False
+            self.month_spend += cost
+            snap = self._snapshot(now)
+            crossed = snap["over_budget"] and not self.alerting
+            self.alerting = snap["over_budget"]
+        if crossed:
+            for callback in self._callbacks or [_print_alert]:
+                try:
+                    callback(snap)
+                except Exception as e:
+                    print(f"[BUDGET] Alert callback failed: {e}")
+
+    def _snapshot(self, now):
+        projected = project_monthly(self.month_spend, now)
+        return {
+            "month": self.month,
+            "month_to_date": self.month_spend,
+            "projected_monthly": projected,
+            "budget_monthly": self.budget,
+            "over_budget": projected > self.budget,
+        }
+
+    def snapshot(self):
+        with self._lock:
+            if self.month is None:
+                return None
+            return self._snapshot(datetime.utcnow())
+
+
+def _print_alert(snap):
+    print(f"[BUDGET] Projected monthly spend ${snap['projected_monthly']:.2f} exceeds "
+          f"budget ${snap['budget_monthly']:.2f} (month to date ${snap['month_to_date']:.2f}).")
+
+
+watcher = BudgetWatcher()
+
+
+def current_spend():
+    """
+    Month-to-date spend and projection. In-process values when this process
+    writes runs; otherwise read from the daily rollups (at most 31 rows).
+    """
+    snap = watcher.snapshot()
+    if snap is not None:
+        return snap
+    from utils.training_db import _get_conn, flush
+    flush()
+    now = datetime.utcnow()
+    row = _get_conn().execute(
+        "SELECT COALESCE(SUM(cost), 0) FROM cost_rollups WHERE granularity = 'day' AND bucket >= ?",
+        (now.strftime("%Y-%m-01"),)
+    ).fetchone()
+    spend = float(row[0])
+    projected = project_monthly(spend, now)
+    return {
+        "month": _month_key(now),
+        "month_to_date": spend,
+        "projected_monthly": projected,
+        "budget_monthly": BUDGET_MONTHLY_USD,
+        "over_budget": projected > BUDGET_MONTHLY_USD,
+    }
+
+
+def rollups(granularity="day", since=None, agent=None, task=None, model=None):
+    """Rows from cost_rollups ('hour' or 'day'), oldest first. since is a bucket prefix like '2025-08-01'."""
+    from utils.training_db import _get_conn, flush
+    flush()
+    clauses, params = ["granularity = ?"], [granularity]
+    if since is not None:
+        clauses.append("bucket >= ?")
+        params.append(since)
+    for column, value in (("agent", agent), ("task", task), ("model", model)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    sql = f"SELECT * FROM cost_rollups WHERE {' AND '.join(clauses)} ORDER BY bucket"
+    return [dict(r) for r in _get_conn().execute(sql, params).fetchall()]
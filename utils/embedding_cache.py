@@ -0,0 +1,144 @@
+# utils/embedding_cache.py
+"""
+Content-addressed embedding cache shared by the semantic indexers.
+
+Vectors are stored as float32 BLOBs in SQLite, keyed by (model name, SHA-256
+of the text). embed_cached() only sends uncached texts to the encoder, in
+batches capped by item count and estimated tokens, so re-indexing unchanged
+data makes no embedding calls.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+
+CACHE_PATH = Path(os.getenv("EMBEDDING_CACHE_PATH", "logs/embedding_cache.db"))
+MAX_BATCH_ITEMS = int(os.getenv("EMBEDDING_BATCH_ITEMS", "256"))
+MAX_BATCH_TOKENS = int(os.getenv("EMBEDDING_BATCH_TOKENS", "100000"))
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+
+def estimate_tokens(text):
+    """Token count for a text (tiktoken when available, else ~4 chars per token)."""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, path=CACHE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS embeddings (
+            model TEXT,
+            hash TEXT,
+            dim INTEGER,
+            vector BLOB,
+            PRIMARY KEY (model, hash)
+        )
+        """)
+        self._conn.commit()
+
+    def get_many(self, model, hashes):
+        """Return {hash: vector} for the hashes present in the cache."""
+        found = {}
+        hashes = list(hashes)
+        with self._lock:
+            for i in range(0, len(hashes), 500):
+                chunk = hashes[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                for h, blob in self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({marks})",
+                    [model, *chunk]
+                ):
+                    found[h] = np.frombuffer(blob, dtype="float32")
+        return found
+
+    def put_many(self, model, items):
+        """Store (hash, vector) pairs."""
+        rows = []
+        for h, vec in items:
+            vec = np.asarray(vec, dtype="float32")
+            rows.append((model, h, vec.shape[0], vec.tobytes()))
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_embedding_cache():
+    """Return the process-wide EmbeddingCache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache()
+        return _cache
+
+
+def iter_batches(texts, max_items=MAX_BATCH_ITEMS, max_tokens=MAX_BATCH_TOKENS):
+    """Split texts into lists capped by item count and estimated total tokens."""
+    batch, tokens = [], 0
+    for text in texts:
+        n = estimate_tokens(text)
+        if batch and (len(batch) >= max_items or tokens + n > max_tokens):
+            yield batch
+            batch, tokens = [], 0
+        batch.append(text)
+        tokens += n
+    if batch:
+        yield batch
+
+
+def embed_cached(texts, model, encode_fn, max_items=MAX_BATCH_ITEMS, max_tokens=MAX_BATCH_TOKENS, stats=None):
+    """
+    Embed texts through the cache. Returns a float32 array with one row per text.
+
+    encode_fn(list_of_texts) must return one vector per text; it is only called
+    for texts missing from the cache. Pass a dict as `stats` to collect
+    hit/miss/call counts.
+    """
+    stats = stats if stats is not None else {}
+    for k in ("hits", "misses", "calls"):
+        stats.setdefault(k, 0)
+
+    texts = list(texts)
+    hashes = [text_hash(t) for t in texts]
+    cache = get_embedding_cache()
+    vectors = cache.get_many(model, set(hashes))
+    stats["hits"] += sum(1 for h in hashes if h in vectors)
+
+    missing = {}
+    for h, t in zip(hashes, texts):
+        if h not in vectors:
+            missing.setdefault(h, t)
+    stats["misses"] += len(missing)
+
+    if missing:
+        by_text = {t: h for h, t in missing.items()}
+        for batch in iter_batches(list(missing.values()), max_items, max_tokens):
+            encoded = np.asarray(encode_fn(batch), dtype="float32")
+            stats["calls"] += 1
+            learned = [(by_text[t], vec) for t, vec in zip(batch, encoded)]
+            cache.put_many(model, learned)
+            vectors.update(learned)
+
+    if not texts:
+        return np.empty((0, 0), dtype="float32")
+    return np.vstack([vectors[h] for h in hashes]).astype("float32")
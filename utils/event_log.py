@@ -0,0 +1,268 @@
+"""
+Append-only JSONL event logs under logs/events/.
+
+Each event is one JSON line appended under a file lock, so concurrent
+processes never lose writes and an append costs the same however long the
+log is. The active file rotates to <name>.<stamp>.jsonl once it passes
+MAX_BYTES or a new day/month begins; readers walk the rotated segments too.
+
+    log = get_log("optimizer_decisions")
+    log.append({"agent": "optimizer", "change_summary": "..."})
+    log.tail(10, agent="optimizer")
+
+    python -m utils.event_log tail optimizer_decisions -n 10 --where agent=optimizer
+"""
+import argparse
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from filelock import FileLock
+
+EVENTS_DIR = Path(os.getenv("EVENT_LOG_DIR", "logs/events"))
+MAX_BYTES = int(os.getenv("EVENT_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+ROTATE_EVERY = os.getenv("EVENT_LOG_ROTATE", "month")  # "day", "month" or "none"
+
+# JSON-array logs written before the event log existed; imported on first use
+LEGACY_FILES = {
+    "optimizer_decisions": Path("logs/optimizer_decisions.json"),
+    "training_notes": Path("logs/training_notes_log.json"),
+}
+
+_PERIOD_FORMAT = {"day": "%Y-%m-%d", "month": "%Y-%m"}
+_READ_BLOCK = 64 * 1024
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+class EventLog:
+    def __init__(self, name: str, directory: Path = None, max_bytes: int = None,
+                 rotate_every: str = None, legacy_file: Optional[Path] = None):
+        self.name = name
+        self.directory = Path(directory or EVENTS_DIR)
+        self.path = self.directory / f"{name}.jsonl"
+        self.max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+        self.rotate_every = ROTATE_EVERY if rotate_every is None else rotate_every
+        self.legacy_file = legacy_file
+        self._lock = FileLock(str(self.path) + ".lock")
+        self._migrated = False
+
+    # ---------- writing ----------
+
+    def append(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Append one event; a 'ts' (UTC ISO) field is added if missing."""
+        event = dict(event)
+        event.setdefault("ts", _now())
+        line = json.dumps(event, default=str, ensure_ascii=False) + "\n"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._migrate_legacy()
+            self._maybe_rotate(len(line.encode("utf-8")))
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        return event
+
+    def _maybe_rotate(self, incoming: int):
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return
+        if not stat.st_size:
+            return
+        fmt = _PERIOD_FORMAT.get(self.rotate_every)
+        last_write = datetime.utcfromtimestamp(stat.st_mtime)
+        new_period = fmt and last_write.strftime(fmt) != datetime.utcnow().strftime(fmt)
+        if new_period or stat.st_size + incoming > self.max_bytes:
+            os.replace(self.path, self._segment_name(last_write))
+
+    def _segment_name(self, when: datetime) -> Path:
+        stamp = when.strftime("%Y%m%dT%H%M%S%f")
+        path = self.directory / f"{self.name}.{stamp}.jsonl"
+        n = 1
+        while path.exists():
+            path = self.directory / f"{self.name}.{stamp}-{n}.jsonl"
+            n += 1
+        return path
+
+    def _migrate_legacy(self):
+        """Import a legacy JSON array as the oldest segment and set the file aside (lock held)."""
+        if self._migrated:
+            return
+        self._migrated = True
+        legacy = self.legacy_file
+        if legacy is None or not legacy.exists():
+            return
+        entries = _read_json_array(legacy)
+        mtime = datetime.utcfromtimestamp(legacy.stat().st_mtime)
+        if entries:
+            # Runs before the first append, so this becomes the oldest segment
+            segment = self._segment_name(mtime)
+            with open(segment, "w", encoding="utf-8") as f:
+                for entry in entries:
+                    if isinstance(entry, dict):
+                        entry.setdefault("ts", _legacy_ts(entry, mtime))
+                    f.write(json.dumps(entry, default=str, ensure_ascii=False) + "\n")
+        os.replace(legacy, legacy.with_name(legacy.name + ".migrated"))
+        print(f"[EVENT_LOG] Migrated {len(entries)} entr{'y' if len(entries) == 1 else 'ies'} from {legacy}")
+
+    def migrate(self):
+        """Import the legacy JSON file now instead of on the next append."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._migrate_legacy()
+
+    # ---------- reading ----------
+
+    def segments(self) -> List[Path]:
+        """Rotated segments oldest first, then the active file."""
+        rotated = sorted(self.directory.glob(f"{self.name}.*.jsonl"))
+        return rotated + ([self.path] if self.path.exists() else [])
+
+    def iter_events(self, since: Optional[str] = None, until: Optional[str] = None,
+                    where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                    **match) -> Iterator[Dict[str, Any]]:
+        """Events oldest first; since/until compare against 'ts', match on field equality."""
+        self._ensure_migrated()
+        for segment in self.segments():
+            try:
+                f = open(segment, "r", encoding="utf-8")
+            except FileNotFoundError:
+                continue  # rotated away while we were listing
+            with f:
+                for line in f:
+                    event = _parse(line)
+                    if event is not None and _matches(event, since, until, where, match):
+                        yield event
+
+    def tail(self, n: int = 20, since: Optional[str] = None,
+             where: Optional[Callable[[Dict[str, Any]], bool]] = None, **match) -> List[Dict[str, Any]]:
+        """The last n matching events, oldest first, reading segments backwards from the end."""
+        self._ensure_migrated()
+        found: List[Dict[str, Any]] = []
+        for segment in reversed(self.segments()):
+            for line in _reverse_lines(segment):
+                event = _parse(line)
+                if event is None:
+                    continue
+                if since is not None and str(event.get("ts", "")) < since:
+                    return found[::-1]
+                if _matches(event, None, None, where, match):
+                    found.append(event)
+                    if len(found) >= n:
+                        return found[::-1]
+        return found[::-1]
+
+    def _ensure_migrated(self):
+        if not self._migrated and self.legacy_file is not None and self.legacy_file.exists():
+            self.migrate()
+
+
+def _parse(line: str) -> Optional[Dict[str, Any]]:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError:
+        return None  # torn write from a crashed process
+
+
+def _matches(event, since, until, where, match) -> bool:
+    ts = str(event.get("ts", ""))
+    if since is not None and ts < since:
+        return False
+    if until is not None and ts >= until:
+        return False
+    if any(event.get(key) != value for key, value in match.items()):
+        return False
+    return where is None or where(event)
+
+
+def _reverse_lines(path: Path) -> Iterator[str]:
+    """Lines of a file from last to first, reading fixed-size blocks from the end."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b""
+        while position > 0:
+            size = min(_READ_BLOCK, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + remainder).split(b"\n")
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line.decode("utf-8", errors="replace")
+        if remainder:
+            yield remainder.decode("utf-8", errors="replace")
+
+
+def _read_json_array(path: Path) -> List[Any]:
+    raw = path.read_bytes()
+    # Some of these files were written by PowerShell as UTF-16 with a BOM
+    if raw.startswith((b"\xff\xfe", b"\xfe\xff")):
+        text = raw.decode("utf-16")
+    else:
+        text = raw.decode("utf-8-sig")
+    try:
+        data = json.loads(text) if text.strip() else []
+    except json.JSONDecodeError as e:
+        print(f"[EVENT_LOG] Could not parse {path}: {e}")
+        return []
+    return data if isinstance(data, list) else [data]
+
+
+def _legacy_ts(entry: Dict[str, Any], fallback: datetime) -> str:
+    value = str(entry.get("timestamp", ""))
+    for parse in (lambda v: datetime.fromisoformat(v.rstrip("Z")),
+                  lambda v: datetime.strptime(v, "%Y-%m-%d_%H-%M")):
+        try:
+            return parse(value).isoformat() + "Z"
+        except ValueError:
+            continue
+    return fallback.isoformat() + "Z"
+
+
+_logs: Dict[str, EventLog] = {}
+_logs_lock = threading.Lock()
+
+
+def get_log(name: str) -> EventLog:
+    """Shared EventLog for name, importing its legacy JSON file on first use."""
+    with _logs_lock:
+        if name not in _logs:
+            _logs[name] = EventLog(name, legacy_file=LEGACY_FILES.get(name))
+        return _logs[name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read or migrate the JSONL event logs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    tail = sub.add_parser("tail", help="print the last matching events")
+    tail.add_argument("name")
+    tail.add_argument("-n", type=int, default=20)
+    tail.add_argument("--since", help="only events with ts >= this ISO timestamp")
+    tail.add_argument("--where", action="append", default=[], metavar="FIELD=VALUE")
+    sub.add_parser("migrate", help="import the legacy JSON array logs")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        for name in LEGACY_FILES:
+            get_log(name).migrate()
+        return
+    match = dict(item.split("=", 1) for item in args.where)
+    for event in get_log(args.name).tail(args.n, since=args.since, **match):
+        print(json.dumps(event, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
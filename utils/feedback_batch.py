@@ -0,0 +1,196 @@
+# utils/feedback_batch.py
+"""
+Batch mode for the feedback analysis chain (summary -> sentiment -> actions).
+
+The three feedback tools take one string per call. analyze_feedback_batch()
+runs the same chain over thousands of entries at once:
+  - entries (strings, dicts with 'text', or a DataFrame column) are
+    normalized and lowercased once, not tokenized, then joined into one
+    corpus,
+  - each lexicon word is located in the whole corpus with a single C-level
+    str.split scan, and the hit offsets are mapped back to entries with
+    NumPy (searchsorted + bincount) - 17 scans in total instead of 17 per
+    entry; a compiled regex alternation measured slower in CPython's re
+    engine,
+  - labels and action plans are shared per label instead of built per entry.
+
+Counts match summing str.count per word, as the single-entry tool does.
+
+The lexicon and action templates live here so the single-entry tools and
+the batch path always agree.
+"""
+
+import numpy as np
+
+POSITIVE = ["good", "great", "excellent", "amazing", "positive", "love", "wonderful", "clean"]
+NEGATIVE = ["bad", "poor", "terrible", "hate", "awful", "dirty", "noisy", "delay", "slow"]
+
+
+SUMMARY_CHARS = 800
+
+ACTIONS = {
+    "Negative": [
+        "1) Immediately assign a staff member to address major concerns raised.",
+        "2) Offer resolution or concession where appropriate to rebuild trust.",
+        "3) Log detailed issue into knowledge base for root-cause analysis.",
+    ],
+    "Positive": [
+        "1) Follow up with thankful outreach and request for testimonial.",
+        "2) Identify high-engagement leads for next-step conversion outreach.",
+    ],
+    "Neutral": [
+        "1) Request more detail from neutral responses to clarify intent.",
+        "2) Monitor for patterns over the next campaign cycle.",
+    ],
+}
+# A generic action that always makes sense
+FINAL_ACTION = "Final) Incorporate feedback into next campaign brief and update outreach templates."
+
+
+def normalize_entry(entry):
+    """Stripped feedback text of a string or a dict with 'text'."""
+    text = entry.get("text", "") if isinstance(entry, dict) else str(entry)
+    return (text or "").strip()
+
+
+def normalize_entries(feedback_data, text_column="text"):
+    """Non-empty feedback texts from an iterable of entries, a single string or a DataFrame."""
+    if feedback_data is None:
+        return []
+    if hasattr(feedback_data, "columns"):  # pandas DataFrame
+        feedback_data = feedback_data[text_column].fillna("").astype(str).tolist()
+    elif isinstance(feedback_data, (str, dict)):
+        feedback_data = [feedback_data]
+    texts = []
+    try:
+        for entry in feedback_data:
+            text = normalize_entry(entry)
+            if text:
+                texts.append(text)
+    except TypeError:
+        # Not iterable: treat as a single entry
+        text = str(feedback_data).strip()
+        if text:
+            texts = [text]
+    return texts
+
+
+def sentiment_counts(text):
+    """(positive, negative) lexicon hits in a text."""
+    text = text.lower()
+    return sum(text.count(w) for w in POSITIVE), sum(text.count(w) for w in NEGATIVE)
+
+
+def sentiment_label(pos, neg):
+    if pos > neg:
+        return "Positive"
+    if neg > pos:
+        return "Negative"
+    return "Neutral"
+
+
+def format_sentiment(pos, neg):
+    """Sentiment line in the format of generate_sentiment_analysis_tool."""
+    label = sentiment_label(pos, neg)
+    if label == "Positive":
+        reason = f"Detected {pos} positive tokens vs {neg} negative tokens."
+    elif label == "Negative":
+        reason = f"Detected {neg} negative tokens vs {pos} positive tokens."
+    else:
+        reason = f"No clear positive/negative dominance ({pos} pos / {neg} neg)."
+    return f"{label}: {reason}"
+
+
+def format_actions(summary, sentiment_label_):
+    """Action plan in the format of generate_follow_up_actions_tool."""
+    key = "Negative" if "Negative" in sentiment_label_ else "Positive" if "Positive" in sentiment_label_ else "Neutral"
+    actions = ACTIONS[key] + [FINAL_ACTION]
+    return f"Sentiment: {sentiment_label_}\nSummary: {summary}\n\nRecommended Actions:\n" + "\n".join(actions)
+
+
+def summarize(texts, top=3):
+    """Summary line in the format of generate_feedback_summary_tool."""
+    picked = texts[:top]
+    joined = " | ".join(picked)
+    if len(joined) > SUMMARY_CHARS:
+        joined = joined[:SUMMARY_CHARS - 3] + "..."
+    return f"Feedback Summary (top {len(picked)}): {joined}"
+
+
+def score_batch(texts):
+    """Positive and negative hit counts per text as two int arrays."""
+    n = len(texts)
+    pos, neg = np.zeros(n, dtype=np.int64), np.zeros(n, dtype=np.int64)
+    if not n:
+        return pos, neg
+    lowered = [t.lower() for t in texts]
+    # Start offset of each entry in the joined corpus; no lexicon word contains "\n",
+    # so a hit never spans two entries
+    lengths = np.fromiter((len(t) + 1 for t in lowered), dtype=np.int64, count=n)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    corpus = "\n".join(lowered)
+
+    for words, counts in ((POSITIVE, pos), (NEGATIVE, neg)):
+        for word in words:
+            pieces = corpus.split(word)
+            if len(pieces) == 1:
+                continue
+            # Hit k starts after pieces[0..k] and k earlier copies of the word
+            piece_lengths = np.fromiter(map(len, pieces), dtype=np.int64, count=len(pieces))
+            offsets = np.cumsum(piece_lengths[:-1] + len(word)) - len(word)
+            owner = np.searchsorted(starts, offsets, side="right") - 1
+            counts += np.bincount(owner, minlength=n)
+    return pos, neg
+
+
+def analyze_feedback_batch(feedback_data, text_column="text", top=3):
+    """
+    Run summary -> sentiment -> actions over many feedback entries.
+
+    Returns a dict with:
+      - "entries": column-oriented per-entry results: text, positive and
+        negative counts (NumPy arrays) and label per entry; see iter_entry_results()
+        for the per-entry strings the single-entry tools would produce,
+      - "aggregate": summary, sentiment (over all entries) and actions for the
+        whole batch, plus label counts.
+    """
+    texts = normalize_entries(feedback_data, text_column)
+    pos, neg = score_batch(texts)
+    diff = np.sign(pos - neg)
+    labels = np.array(["Neutral", "Positive", "Negative"], dtype=object)[diff]  # sign -1 indexes "Negative"
+
+    total_pos, total_neg = int(pos.sum()), int(neg.sum())
+    summary = summarize(texts, top) if texts else "No valid feedback entries."
+    label = sentiment_label(total_pos, total_neg)
+    return {
+        "count": len(texts),
+        "entries": {"text": texts, "positive": pos, "negative": neg, "label": labels},
+        "aggregate": {
+            "summary": summary,
+            "sentiment": format_sentiment(total_pos, total_neg),
+            "actions": format_actions(summary, label),
+            "labels": {name: int((labels == name).sum()) for name in ("Positive", "Negative", "Neutral")},
+        },
+    }
+
+
+def iter_entry_results(result):
+    """Per-entry summary, sentiment and actions strings, generated lazily."""
+    entries = result["entries"]
+    for text, pos, neg, label in zip(entries["text"], entries["positive"], entries["negative"], entries["label"]):
+        summary = summarize([text], 1)
+        yield {
+            "summary": summary,
+            "sentiment": format_sentiment(int(pos), int(neg)),
+            "actions": format_actions(summary, label),
+        }
+
+
+def format_report(result):
+    """Aggregate report text for agents."""
+    agg = result["aggregate"]
+    labels = agg["labels"]
+    return (
+        f"Feedback entries: {result['count']} ({labels['Positive']} positive / {labels['Negative']} negative / "
+        f"{labels['Neutral']} neutral)\n{agg['summary']}\nOverall sentiment: {agg['sentiment']}\n\n{agg['actions']}"
+    )
@@ -0,0 +1,283 @@
+# utils/feedback_stream.py
+"""
+Streaming feedback ingestion with constant memory.
+
+iter_feedback() reads JSONL, CSV or plain-text exports (optionally gzipped),
+or stdin, one record at a time and yields normalized feedback texts.
+FeedbackAggregator consumes that stream in fixed-size chunks and keeps only
+running aggregates:
+  - entry, character and per-label counts and a sentiment score histogram,
+  - top-k themes (frequent keywords) with Space-Saving counters, so the
+    number of tracked terms never exceeds THEME_CAPACITY,
+  - the k strongest positive and negative quotes in bounded min-heaps.
+snapshot() may be called at any point, also from another thread while
+ingest() is running, and returns the summary of what has been read so far.
+
+    python -m utils.feedback_stream export.jsonl [--every 50000]
+    cat export.csv | python -m utils.feedback_stream - --format csv
+"""
+
+import argparse
+import csv
+import gzip
+import heapq
+import io
+import json
+import re
+import sys
+import threading
+from collections import Counter
+from itertools import chain, islice
+from pathlib import Path
+
+import numpy as np
+
+from utils.feedback_batch import normalize_entry, score_batch, sentiment_label
+
+CHUNK_SIZE = 5000        # entries scored together
+THEME_CAPACITY = 500     # Space-Saving counters kept for theme terms
+TOP_THEMES = 10
+TOP_QUOTES = 3
+QUOTE_CHARS = 280
+HISTOGRAM_RANGE = 5      # sentiment scores are clipped to [-5, 5]
+TEXT_FIELDS = ("text", "feedback", "comment", "message")
+
+_TOKEN_RE = re.compile(r"[a-z][a-z'-]{2,}")
+STOPWORDS = frozenset("""
+the and was were but for with that this our you your they them their there have has had not are
+its it's very too all any can could would should will just also from into out about than then
+when what which who how been being more most some such only own same other over under again
+further once here why both each few nor off above below between during before after because
+until while again ever really much many lot bit did does doing get got she his her him hers
+""".split())
+
+
+# ---------- reading ----------
+
+def _open_text(path):
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", newline=""), Path(path.stem).suffix
+    return open(path, "r", encoding="utf-8-sig", newline=""), path.suffix
+
+
+def _records(handle, fmt):
+    if fmt == "csv":
+        reader = csv.DictReader(handle)
+        field = next((f for f in TEXT_FIELDS if f in (reader.fieldnames or [])), None)
+        for row in reader:
+            # Short rows fill missing fields with None; extra fields land as a list under the None key
+            yield (row.get(field) or "") if field else " ".join(v for v in row.values() if isinstance(v, str) and v)
+    elif fmt == "jsonl":
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = line
+            if record is None:
+                continue  # a JSON null line
+            if isinstance(record, dict) and "text" not in record:
+                record = next((record[f] for f in TEXT_FIELDS if f in record), "")
+            yield record
+    else:
+        yield from handle
+
+
+def iter_feedback(source, fmt=None):
+    """
+    Yield normalized, non-empty feedback texts one at a time.
+
+    source may be a path (.jsonl, .csv, .txt, optionally .gz), "-" for stdin,
+    an open text file, a DataFrame with a 'text' column, or any iterable of
+    strings/dicts. fmt ("jsonl", "csv", "text") overrides detection from the
+    file extension; stdin and open files default to JSONL.
+    """
+    if isinstance(source, Path) or (isinstance(source, str) and source != "-"):
+        handle, suffix = _open_text(source)
+        fmt = fmt or {".jsonl": "jsonl", ".csv": "csv"}.get(suffix, "text")
+        with handle:
+            yield from _normalized(_records(handle, fmt))
+        return
+    if isinstance(source, str):
+        source = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig")
+    if isinstance(source, io.TextIOBase):
+        yield from _normalized(_records(source, fmt or "jsonl"))
+        return
+    if hasattr(source, "columns"):  # pandas DataFrame
+        source = source["text"]
+    yield from _normalized(source)
+
+
+def _normalized(records):
+    for record in records:
+        if record is None:
+            continue  # would otherwise become the text "None"
+        text = normalize_entry(record)
+        if text:
+            yield text
+
+
+# ---------- aggregates ----------
+
+class SpaceSaving:
+    """
+    Approximate top-k counter over a stream (Metwally et al.) in bounded memory.
+
+    At most `capacity` terms are tracked; a new term replaces the current
+    minimum and inherits its count, so counts are over-estimates by at most
+    the evicted minimum (kept as `error`).
+    """
+
+    def __init__(self, capacity=THEME_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        self.error = {}
+        self._heap = []  # (count, term) with stale entries skipped lazily
+
+    def add(self, term, n=1):
+        if term in self.counts:
+            self.counts[term] += n
+        elif len(self.counts) < self.capacity:
+            self.counts[term] = n
+            self.error[term] = 0
+        else:
+            floor, victim = self._pop_min()
+            del self.counts[victim], self.error[victim]
+            self.counts[term] = floor + n
+            self.error[term] = floor
+        heapq.heappush(self._heap, (self.counts[term], term))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, t) for t, c in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        while True:
+            count, term = heapq.heappop(self._heap)
+            if self.counts.get(term) == count:
+                return count, term
+
+    def top(self, k):
+        return heapq.nlargest(k, self.counts.items(), key=lambda item: item[1])
+
+
+class FeedbackAggregator:
+    def __init__(self, top_themes=TOP_THEMES, top_quotes=TOP_QUOTES, theme_capacity=THEME_CAPACITY):
+        self.top_themes = top_themes
+        self.top_quotes = top_quotes
+        self.entries = 0
+        self.chars = 0
+        self.labels = {"Positive": 0, "Negative": 0, "Neutral": 0}
+        self.positive_hits = 0
+        self.negative_hits = 0
+        self.histogram = [0] * (2 * HISTOGRAM_RANGE + 1)
+        self.themes = SpaceSaving(theme_capacity)
+        self._quotes = {"Positive": [], "Negative": []}  # min-heaps of (strength, seq, quote)
+        self._lock = threading.Lock()
+
+    def add_many(self, texts):
+        """Fold one chunk of texts into the aggregates."""
+        pos, neg = score_batch(texts)
+        diff = pos - neg
+        histogram = np.bincount(np.clip(diff, -HISTOGRAM_RANGE, HISTOGRAM_RANGE) + HISTOGRAM_RANGE,
+                                minlength=len(self.histogram))
+        # Each term counts once per entry; the chunk's counts go into Space-Saving
+        # as one weighted add per distinct term
+        terms = Counter(chain.from_iterable(set(_TOKEN_RE.findall(text.lower())) - STOPWORDS for text in texts))
+        with self._lock:
+            seq = self.entries
+            self.entries += len(texts)
+            self.chars += sum(map(len, texts))
+            self.positive_hits += int(pos.sum())
+            self.negative_hits += int(neg.sum())
+            self.histogram = [a + int(b) for a, b in zip(self.histogram, histogram)]
+            for term, n in terms.items():
+                self.themes.add(term, n)
+            for label, candidates in (("Positive", np.flatnonzero(diff > 0)), ("Negative", np.flatnonzero(diff < 0))):
+                self.labels[label] += len(candidates)
+                strength = np.abs(diff[candidates])
+                # Only the chunk's strongest (earliest on ties) can enter the top quotes
+                for i in candidates[np.lexsort((candidates, -strength))[:self.top_quotes]].tolist():
+                    self._keep_quote(label, int(abs(diff[i])), seq + i, texts[i])
+            self.labels["Neutral"] = self.entries - self.labels["Positive"] - self.labels["Negative"]
+
+    def _keep_quote(self, label, strength, seq, text):
+        heap = self._quotes[label]
+        item = (strength, -seq, text[:QUOTE_CHARS])  # ties keep the earliest quote
+        if len(heap) < self.top_quotes:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    def ingest(self, texts, chunk_size=CHUNK_SIZE, snapshot_every=None, on_snapshot=None):
+        """
+        Consume an iterable of texts chunk by chunk; returns the final snapshot.
+
+        With snapshot_every, on_snapshot(snapshot) is called each time at least
+        that many more entries have been read.
+        """
+        texts = iter(texts)
+        next_snapshot = snapshot_every
+        while True:
+            chunk = list(islice(texts, chunk_size))
+            if not chunk:
+                break
+            self.add_many(chunk)
+            if snapshot_every and on_snapshot and self.entries >= next_snapshot:
+                on_snapshot(self.snapshot())
+                next_snapshot = self.entries + snapshot_every
+        return self.snapshot()
+
+    def snapshot(self):
+        """Summary of everything ingested so far."""
+        with self._lock:
+            quotes = {label: [q for _, _, q in sorted(heap, reverse=True)] for label, heap in self._quotes.items()}
+            return {
+                "entries": self.entries,
+                "avg_chars": round(self.chars / self.entries, 1) if self.entries else 0,
+                "labels": dict(self.labels),
+                "sentiment": sentiment_label(self.positive_hits, self.negative_hits),
+                "histogram": {score - HISTOGRAM_RANGE: n for score, n in enumerate(self.histogram)},
+                "themes": self.themes.top(self.top_themes),
+                "quotes": quotes,
+            }
+
+
+def format_snapshot(snapshot):
+    """Short text digest of a snapshot for agents and logs."""
+    labels = snapshot["labels"]
+    themes = ", ".join(f"{term} ({count})" for term, count in snapshot["themes"]) or "none"
+    lines = [
+        f"Feedback entries: {snapshot['entries']} ({labels['Positive']} positive / {labels['Negative']} negative / "
+        f"{labels['Neutral']} neutral), overall {snapshot['sentiment']}",
+        f"Top themes: {themes}",
+    ]
+    for label in ("Negative", "Positive"):
+        for quote in snapshot["quotes"][label]:
+            lines.append(f"{label} quote: \"{quote}\"")
+    return "\n".join(lines)
+
+
+def summarize_stream(source, fmt=None, **kwargs):
+    """Ingest a feedback source and return the final snapshot."""
+    return FeedbackAggregator().ingest(iter_feedback(source, fmt), **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a feedback export and print running aggregates.")
+    parser.add_argument("source", help="path to a .jsonl/.csv/.txt export (optionally .gz), or - for stdin")
+    parser.add_argument("--format", choices=["jsonl", "csv", "text"])
+    parser.add_argument("--every", type=int, default=50000, help="print a partial summary every N entries")
+    args = parser.parse_args()
+
+    def _progress(snapshot):
+        print(f"--- after {snapshot['entries']} entries ---\n{format_snapshot(snapshot)}\n", flush=True)
+
+    final = summarize_stream(args.source, args.format, snapshot_every=args.every, on_snapshot=_progress)
+    print(f"=== final ===\n{format_snapshot(final)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+# utils/feedback_themes.py
+"""
+Theme extraction for large feedback exports.
+
+Instead of the first few entries, agents get a ranked digest of what the
+feedback is about:
+  - entries are read from any iter_feedback() source; above SAMPLE_SIZE a
+    uniform reservoir sample is kept, so memory is bounded and theme sizes
+    are scaled up to the full export,
+  - duplicate texts are embedded once and weighted by how often they occur,
+  - embeddings come from the semantic index's SentenceTransformer model
+    (all-MiniLM-L6-v2), which batches at EMBED_BATCH_SIZE; feedback texts are
+    one-off, so they are not written to the persistent embedding cache,
+  - vectors are clustered with spherical mini-batch k-means in NumPy; the
+    number of themes is the k in 2..MAX_THEMES with the best silhouette score,
+    and themes whose centers are still near-duplicates (cosine above
+    MERGE_SIMILARITY) are merged,
+  - each theme gets its size, share, dominant sentiment (a +/-/= marker in
+    the digest), distinctive keywords and a representative quote (the entry
+    closest to the centroid).
+"""
+
+import os
+import random
+from collections import Counter
+
+import numpy as np
+
+from utils.feedback_batch import score_batch, sentiment_label
+from utils.feedback_stream import QUOTE_CHARS, STOPWORDS, _TOKEN_RE, iter_feedback
+
+MAX_THEMES = int(os.getenv("FEEDBACK_MAX_THEMES", "8"))
+MIN_ENTRIES = int(os.getenv("FEEDBACK_THEME_MIN_ENTRIES", "20"))  # below this, themes are not worth it
+SAMPLE_SIZE = int(os.getenv("FEEDBACK_THEME_SAMPLE", "20000"))
+KMEANS_BATCH = 1024
+KMEANS_ITERATIONS = 100
+SILHOUETTE_SAMPLE = 2000  # rows scored when comparing candidate k
+MERGE_SIMILARITY = float(os.getenv("FEEDBACK_THEME_MERGE", "0.9"))
+KEYWORDS = 3
+
+
+# ---------- input ----------
+
+def sample_feedback(source, limit=SAMPLE_SIZE, seed=0):
+    """
+    Up to `limit` texts from a feedback source and the total number of entries.
+
+    Reservoir sampling (Algorithm R): every entry has the same chance of being
+    kept, whatever the length of the stream.
+    """
+    rng = random.Random(seed)
+    sample, total = [], 0
+    for total, text in enumerate(iter_feedback(source), 1):
+        if len(sample) < limit:
+            sample.append(text)
+        else:
+            j = rng.randrange(total)
+            if j < limit:
+                sample[j] = text
+    return sample, total
+
+
+def embed_feedback(texts, stats=None):
+    """Unit-length embeddings of texts, one row per text."""
+    from utils.semantic_index_builder import _encode
+    if not texts:
+        return np.empty((0, 0), dtype="float32")
+    vectors = np.asarray(_encode(texts), dtype="float32")
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-9
+    if stats is not None:
+        stats["embedded"] = len(texts)
+    return vectors
+
+
+# ---------- clustering ----------
+
+def _init_centers(X, weights, k, rng):
+    """k-means++ seeding on cosine distance."""
+    centers = [X[rng.choice(len(X), p=weights / weights.sum())]]
+    closest = 1.0 - X @ centers[0]
+    for _ in range(1, k):
+        p = weights * np.maximum(closest, 0) ** 2
+        if p.sum() <= 0:
+            break  # fewer distinct points than k
+        centers.append(X[rng.choice(len(X), p=p / p.sum())])
+        closest = np.minimum(closest, 1.0 - X @ centers[-1])
+    return np.array(centers)
+
+
+def assign(X, centers, chunk=8192):
+    """Index of the most similar center and that similarity, per row of X."""
+    labels = np.empty(len(X), dtype=np.int64)
+    similarity = np.empty(len(X), dtype=X.dtype)
+    for i in range(0, len(X), chunk):
+        sims = X[i:i + chunk] @ centers.T
+        labels[i:i + chunk] = sims.argmax(axis=1)
+        similarity[i:i + chunk] = sims[np.arange(len(sims)), labels[i:i + chunk]]
+    return labels, similarity
+
+
+def minibatch_kmeans(X, k, weights=None, batch_size=KMEANS_BATCH, iterations=KMEANS_ITERATIONS, seed=0):
+    """
+    Spherical mini-batch k-means (Sculley, 2010) on unit-length rows of X.
+
+    Each step assigns a random batch to its nearest centers and moves every
+    center towards its batch mean with a per-center learning rate of
+    points assigned now / points assigned so far, all as matrix operations. Returns
+    (centers, labels, similarity to own center).
+    """
+    rng = np.random.default_rng(seed)
+    weights = np.ones(len(X)) if weights is None else np.asarray(weights, dtype=np.float64)
+    centers = _init_centers(X, weights, min(k, len(X)), rng)
+    k = len(centers)
+    seen = np.zeros(k)
+    p = weights / weights.sum()  # duplicates are drawn as often as they occur
+    for _ in range(iterations):
+        batch = X[rng.choice(len(X), size=batch_size, p=p)]
+        labels = (batch @ centers.T).argmax(axis=1)
+        members = np.zeros((k, len(batch)), dtype=X.dtype)
+        members[labels, np.arange(len(batch))] = 1
+        mass = members.sum(axis=1)
+        sums = members @ batch
+        seen += mass
+        moved = mass > 0
+        rate = (mass[moved] / seen[moved])[:, None]
+        centers[moved] += rate * (sums[moved] / mass[moved][:, None] - centers[moved])
+        centers /= np.linalg.norm(centers, axis=1, keepdims=True) + 1e-9
+    labels, similarity = assign(X, centers)
+    return centers, labels, similarity
+
+
+def silhouette(X, labels, weights=None, sample=SILHOUETTE_SAMPLE, seed=0):
+    """
+    Mean silhouette score under cosine distance, over a weighted sample of rows.
+
+    Distances are one sample x sample matrix and per-cluster means one matrix
+    product, so scoring a clustering costs O(sample^2 * dim).
+    """
+    rng = np.random.default_rng(seed)
+    p = None if weights is None else weights / weights.sum()
+    idx = rng.choice(len(X), size=min(sample, len(X)), replace=False, p=p)
+    S, own = X[idx], labels[idx]
+    k, rows = int(labels.max()) + 1, np.arange(len(idx))
+    members = np.zeros((len(idx), k))
+    members[rows, own] = 1
+    counts = members.sum(axis=0)
+    mean_dist = ((1.0 - S @ S.T) @ members) / np.maximum(counts, 1)
+    peers = counts[own] - 1
+    a = mean_dist[rows, own] * counts[own] / np.maximum(peers, 1)  # excludes the row itself
+    mean_dist[:, counts == 0] = np.inf
+    mean_dist[rows, own] = np.inf
+    b = mean_dist.min(axis=1)
+    scores = np.where(peers > 0, (b - a) / np.maximum(np.maximum(a, b), 1e-9), 0.0)
+    return float(scores.mean())
+
+
+def best_kmeans(X, weights, max_k=MAX_THEMES):
+    """minibatch_kmeans result for the k in 2..max_k with the highest silhouette; returns (k, score, result)."""
+    best = None
+    for k in range(2, min(max_k, len(X) - 1) + 1):
+        result = minibatch_kmeans(X, k, weights)
+        if len(result[0]) < k:
+            break  # fewer distinct points than k
+        score = silhouette(X, result[1], weights)
+        if best is None or score > best[1]:
+            best = (k, score, result)
+    return best or (1, 0.0, minibatch_kmeans(X, 1, weights))
+
+
+def merge_close(X, weights, centers, labels, threshold=MERGE_SIMILARITY):
+    """Merge clusters whose centers have cosine >= threshold; returns (centers, labels, similarity)."""
+    centers = centers.copy()
+    while len(centers) > 1:
+        sims = centers @ centers.T
+        np.fill_diagonal(sims, -1)
+        i, j = np.unravel_index(sims.argmax(), sims.shape)
+        if sims[i, j] < threshold:
+            break
+        keep, drop = min(i, j), max(i, j)
+        labels = np.where(labels == drop, keep, labels)
+        labels = np.where(labels > drop, labels - 1, labels)
+        centers = np.delete(centers, drop, axis=0)
+        member = labels == keep
+        merged = (X[member] * weights[member, None]).sum(axis=0)
+        centers[keep] = merged / (np.linalg.norm(merged) + 1e-9)
+    similarity = np.einsum("ij,ij->i", X, centers[labels])
+    return centers, labels, similarity
+
+
+# ---------- themes ----------
+
+def _keywords(texts, weights, labels, k):
+    """Terms most over-represented in each cluster relative to all feedback."""
+    overall, per_theme = Counter(), [Counter() for _ in range(k)]
+    for text, weight, label in zip(texts, weights.tolist(), labels.tolist()):
+        for term in set(_TOKEN_RE.findall(text.lower())) - STOPWORDS:
+            overall[term] += weight
+            per_theme[label][term] += weight
+    total = weights.sum()
+    sizes = np.bincount(labels, weights=weights, minlength=k)
+    keywords = []
+    for counts, size in zip(per_theme, sizes):
+        lift = {term: n / size - overall[term] / total for term, n in counts.items() if n > 1 or size <= 1}
+        keywords.append(sorted(lift, key=lift.get, reverse=True)[:KEYWORDS])
+    return keywords
+
+
+def extract_themes(source, k=None, sample_size=SAMPLE_SIZE, stats=None):
+    """
+    Ranked feedback themes, largest first.
+
+    source is anything iter_feedback() accepts. Each theme is a dict with
+    size (estimated over the whole export when it was sampled), share,
+    sentiment, keywords and quote. Pass a dict as `stats` for entry, sample
+    and embedded-text counts.
+    """
+    stats = stats if stats is not None else {}
+    texts, total = sample_feedback(source, sample_size)
+    counts = Counter(texts)
+    unique = list(counts)
+    weights = np.array([counts[t] for t in unique], dtype=np.float64)
+    stats.update(entries=total, sampled=len(texts), unique=len(unique))
+    if not unique:
+        return []
+
+    X = embed_feedback(unique, stats)
+    if k:
+        centers, labels, _ = minibatch_kmeans(X, k, weights)
+    else:
+        k, stats["silhouette"], (centers, labels, _) = best_kmeans(X, weights)
+    centers, labels, similarity = merge_close(X, weights, centers, labels)
+    k = len(centers)
+    pos, neg = score_batch(unique)
+    keywords = _keywords(unique, weights, labels, k)
+
+    scale = total / weights.sum()
+    themes = []
+    for theme in range(k):
+        members = np.flatnonzero(labels == theme)
+        if not len(members):
+            continue
+        size = weights[members].sum()
+        closest = members[similarity[members].argmax()]
+        themes.append({
+            "size": int(round(size * scale)),
+            "share": size / weights.sum(),
+            "sentiment": sentiment_label(int((pos[members] * weights[members]).sum()),
+                                         int((neg[members] * weights[members]).sum())),
+            "keywords": keywords[theme],
+            "quote": unique[closest][:QUOTE_CHARS],
+        })
+    themes.sort(key=lambda t: t["size"], reverse=True)
+    stats["themes"] = len(themes)
+    return themes
+
+
+# The digest feeds generate_sentiment_analysis_tool, which counts lexicon words
+# such as "positive", so theme tone is shown as a marker rather than a label
+TONE_MARKERS = {"Positive": "+", "Negative": "-", "Neutral": "="}
+
+
+def format_themes(themes, total):
+    """Compact ranked digest of themes for agents."""
+    lines = [f"Feedback themes ({total} entries, {len(themes)} themes, largest first; tone +/-/=):"]
+    for rank, theme in enumerate(themes, 1):
+        keywords = ", ".join(theme["keywords"]) or "n/a"
+        lines.append(f"{rank}. [{theme['size']} entries, {theme['share']:.0%}, {TONE_MARKERS[theme['sentiment']]}] "
+                     f"{keywords}: \"{theme['quote']}\"")
+    return "\n".join(lines)
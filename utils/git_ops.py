@@ -1,11 +1,16 @@
 # utils/git_ops.py
-from git import Repo
 from pathlib import Path
 import tempfile
 import os
+from utils.lazy import lazy
 
 REPO_PATH = Path(__file__).resolve().parents[1]  # project root
-repo = Repo(REPO_PATH)
+
+def _open_repo():
+    from git import Repo
+    return Repo(REPO_PATH)
+
+repo = lazy(_open_repo, "git repo")
 
 def create_patch_and_branch(patch_files: dict, branch_name: str = None, commit_msg: str = "Auto optimization"):
     """
@@ -1,23 +1,75 @@
 import os
-import json
+import sqlite3
+import threading
 from datetime import datetime
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from pathlib import Path
+from utils import notes_memory
+from utils.event_log import get_log
+from utils.lazy import lazy
 
 
 # Load your Google service credentials (adjust the path)
 SERVICE_ACCOUNT_FILE = "secrets/credentials.json"
 SCOPES = ["https://www.googleapis.com/auth/documents", "https://www.googleapis.com/auth/drive.readonly"]
 
-credentials = service_account.Credentials.from_service_account_file(
-    SERVICE_ACCOUNT_FILE, scopes=SCOPES
-)
+def _load_credentials():
+    from google.oauth2 import service_account
+    return service_account.Credentials.from_service_account_file(
+        SERVICE_ACCOUNT_FILE, scopes=SCOPES
+    )
 
-docs_service = build("docs", "v1", credentials=credentials)
-drive_service = build("drive", "v3", credentials=credentials)
+def _build_service(name, version):
+    def _factory():
+        from googleapiclient.discovery import build
+        return build(name, version, credentials=credentials.get())
+    return _factory
 
-# Optional: location to store note metadata logs
-METADATA_LOG_PATH = "logs/notes_metadata.json"
+credentials = lazy(_load_credentials, "google credentials")
+docs_service = lazy(_build_service("docs", "v1"), "docs service")
+drive_service = lazy(_build_service("drive", "v3"), "drive service")
+
+# Extracted text of fetched docs, keyed by doc id and valid while modifiedTime matches
+DOCS_CACHE_PATH = Path(os.getenv("DOCS_CACHE_PATH", "logs/docs_cache.db"))
+BATCH_LIMIT = 100  # requests per Google batch HTTP call
+
+
+class _DocCache:
+    def __init__(self, path=DOCS_CACHE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs (doc_id TEXT PRIMARY KEY, modified_time TEXT, name TEXT, text TEXT)"
+        )
+        self._conn.commit()
+
+    def get_many(self, files):
+        """Cached text for each Drive file whose modifiedTime is unchanged."""
+        found = {}
+        with self._lock:
+            for f in files:
+                row = self._conn.execute(
+                    "SELECT text FROM docs WHERE doc_id = ? AND modified_time = ?", (f["id"], f.get("modifiedTime"))
+                ).fetchone()
+                if row is not None:
+                    found[f["id"]] = row[0]
+        return found
+
+    def put_many(self, entries):
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?)", entries)
+
+
+_doc_cache = None
+_doc_cache_lock = threading.Lock()
+
+
+def get_doc_cache():
+    global _doc_cache
+    with _doc_cache_lock:
+        if _doc_cache is None:
+            _doc_cache = _DocCache()
+        return _doc_cache
 
 
 def list_recent_docs(limit=5):
@@ -31,16 +83,72 @@ def list_recent_docs(limit=5):
     return results.get("files", [])
 
 
+def extract_text(doc):
+    """Plain text of a Docs API document resource."""
+    parts = []
+    for elem in doc.get("body", {}).get("content", []):
+        if "paragraph" in elem:
+            parts.extend(p.get("textRun", {}).get("content", "") for p in elem["paragraph"].get("elements", []))
+    return "".join(parts).strip()
+
+
 def get_document_content(doc_id):
     """Retrieve plain text content of a Google Doc by ID"""
-    doc = docs_service.documents().get(documentId=doc_id).execute()
-    content = doc.get("body", {}).get("content", [])
-    text = ""
-    for elem in content:
-        if "paragraph" in elem:
-            for p in elem["paragraph"].get("elements", []):
-                text += p.get("textRun", {}).get("content", "")
-    return text.strip()
+    return extract_text(docs_service.documents().get(documentId=doc_id).execute())
+
+
+def fetch_documents(files, stats=None):
+    """
+    Text of each Drive file (as returned by list_recent_docs), in the same order.
+
+    Docs whose modifiedTime matches the cache are not downloaded; the rest are
+    fetched with one batch HTTP call per BATCH_LIMIT docs. A doc that fails to
+    download comes back as an empty string.
+    """
+    stats = stats if stats is not None else {}
+    texts = get_doc_cache().get_many(files)
+    missing = [f for f in files if f["id"] not in texts]
+    stats.update(cached=len(files) - len(missing), fetched=0, requests=0)
+
+    fetched = {}
+
+    def _on_response(request_id, response, exception):
+        if exception is not None:
+            print(f"[DOCS] Failed to fetch {request_id}: {exception}")
+            return
+        fetched[request_id] = extract_text(response)
+
+    for i in range(0, len(missing), BATCH_LIMIT):
+        batch = docs_service.new_batch_http_request(callback=_on_response)
+        for f in missing[i:i + BATCH_LIMIT]:
+            batch.add(docs_service.documents().get(documentId=f["id"]), request_id=f["id"])
+        batch.execute()
+        stats["requests"] += 1
+
+    if fetched:
+        get_doc_cache().put_many([
+            (f["id"], f.get("modifiedTime"), f.get("name"), fetched[f["id"]]) for f in missing if f["id"] in fetched
+        ])
+        texts.update(fetched)
+    stats["fetched"] = len(fetched)
+    return [texts.get(f["id"], "") for f in files]
+
+
+def fetch_recent_notes(limit=2):
+    """Text of the most recently modified docs, newest first."""
+    return [text for text in fetch_documents(list_recent_docs(limit)) if text]
+
+
+def upload_to_gdoc(title, content):
+    """Create a Google Doc with the given title and text; returns its URL."""
+    doc = docs_service.documents().create(body={"title": title}).execute()
+    doc_id = doc["documentId"]
+    if content:
+        docs_service.documents().batchUpdate(
+            documentId=doc_id,
+            body={"requests": [{"insertText": {"location": {"index": 1}, "text": content}}]},
+        ).execute()
+    return f"https://docs.google.com/document/d/{doc_id}/edit"
 
 
 def upload_training_notes_to_gdoc(note_content, campaign_name=None):
@@ -51,18 +159,32 @@ def upload_training_notes_to_gdoc(note_content, campaign_name=None):
     campaign_slug = campaign_name.replace(" ", "_") if campaign_name else "general"
     doc_title = f"Training Notes - {campaign_slug} - {date_str}_{time_str}"
 
-    # Fetch memory (previous docs)
-    previous_docs = list_recent_docs()
-    memory_context = ""
-    for doc in previous_docs:
-        doc_id = doc["id"]
-        doc_text = get_document_content(doc_id)
-        memory_context += f"\n--- Memory from {doc['name']} ---\n{doc_text}\n"
+    # Memory: bounded digests of earlier notes rather than their full text, so
+    # docs no longer nest every previous doc inside them (this used to paste
+    # the 5 most recent docs, the baseline savings are reported against)
+    memory_context, memory_report = notes_memory.build_memory(note_content, campaign_name, baseline_notes=5)
 
     # Combine memory context and new note
-    full_content = f"{memory_context}\n\n--- New Notes ({date_str}) ---\n{note_content.strip()}"
+    full_content = note_content.strip() if not memory_context else (
+        f"--- Memory digest ---\n{memory_context}\n\n--- New Notes ({date_str}) ---\n{note_content.strip()}"
+    )
 
     # Create the document
-    doc_metadata = {"title": doc_title}
-    doc = docs_service.documents().create(body=doc_metadata).exe
+    doc_url = upload_to_gdoc(doc_title, full_content)
+
+    get_log("notes_metadata").append({
+        "title": doc_title,
+        "campaign": campaign_name or "general",
+        "gdoc_url": doc_url,
+        "memory_tokens": memory_report["memory_tokens"],
+        "memory_baseline_tokens": memory_report["baseline_tokens"],
+        "memory_tokens_saved": memory_report["saved_tokens"],
+    })
+    print(f"[DOCS] Uploaded {doc_title}: {doc_url}")
 
+    # Fold the note into memory last: the doc and its log entry exist even if this fails
+    try:
+        notes_memory.record_note(campaign_name, note_content)
+    except Exception as e:
+        print(f"[MEMORY] Could not add {doc_title} to notes memory: {e}")
+    return doc_url
@@ -1,10 +1,24 @@
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 from utils.env_loader import load_environment
+from utils.sheets_sync import sync_rows
 
-def upload_to_sheet(leads: list):
-    env = load_environment()
-    SHEET_ID = env["GOOGLE_SHEET_ID"]
+HEADERS = ["URL", "Emails", "Phones", "Category"]
+
+def lead_row(lead: dict) -> list:
+    return [
+        lead.get("url", ""),
+        ", ".join(lead.get("emails", [])),
+        ", ".join(lead.get("phones", [])),
+        lead.get("category", "")
+    ]
+
+def upload_to_sheet(leads: list, sheet_id: str = None):
+    """Append leads not yet in the sheet's "Leads" tab; returns the number of rows written."""
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
+    if not sheet_id:
+        env = load_environment()
+        sheet_id = env["GOOGLE_SHEET_ID"]
 
     scope = ['https://spreadsheets.google.com/feeds',
              'https://www.googleapis.com/auth/drive']
@@ -13,23 +27,14 @@ def upload_to_sheet(leads: list):
         'google_sheets_interface.json', scope)
     client = gspread.authorize(creds)
 
-    sheet = client.open_by_key(SHEET_ID)
+    sheet = client.open_by_key(sheet_id)
     try:
         worksheet = sheet.worksheet("Leads")
-    except:
+    except gspread.WorksheetNotFound:
         worksheet = sheet.add_worksheet(title="Leads", rows="1000", cols="10")
 
-    headers = ["URL", "Emails", "Phones", "Category"]
-    existing = worksheet.get_all_values()
-    if not existing:
-        worksheet.append_row(headers)
-
-    for lead in leads:
-        row = [
-            lead.get("url", ""),
-            ", ".join(lead.get("emails", [])),
-            ", ".join(lead.get("phones", [])),
-            lead.get("category", "")
-        ]
-        if row not in existing:
-            worksheet.append_row(row)
+    stats = {}
+    written = sync_rows(worksheet, [lead_row(lead) for lead in leads], headers=HEADERS, stats=stats)
+    print(f"[SHEETS] {stats['new']} new row(s) in {stats['requests']} request(s), "
+          f"{stats['skipped']} already present (hash cache {stats['cache']})")
+    return written
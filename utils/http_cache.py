@@ -0,0 +1,169 @@
+# utils/http_cache.py
+"""
+On-disk HTTP response cache for scraped pages and search API results.
+
+Entries are keyed by URL plus query parameters and kept in a small SQLite file.
+Fresh entries (younger than the TTL) are served without touching the network;
+stale entries are revalidated with a conditional GET (If-None-Match /
+If-Modified-Since) so unchanged pages come back as a cheap 304. The cache is
+bounded by total body size and evicts least-recently-used entries.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+from urllib.parse import urlencode
+
+CACHE_PATH = Path(os.getenv("HTTP_CACHE_PATH", "logs/http_cache.db"))
+DEFAULT_TTL = float(os.getenv("HTTP_CACHE_TTL", str(6 * 3600)))
+MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+# Query parameters that never belong in a cache key (credentials).
+_SECRET_PARAMS = {"key", "api_key", "apikey", "access_token"}
+
+
+class CachedResponse(namedtuple("CachedResponse", "url status_code text from_cache")):
+    """Minimal response object returned by HttpCache.get."""
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def cache_key(url, params=None):
+    """Build a stable cache key from a URL and its query parameters."""
+    if not params:
+        return url
+    items = sorted((k, str(v)) for k, v in params.items() if k not in _SECRET_PARAMS)
+    return f"{url}?{urlencode(items)}"
+
+
+class HttpCache:
+    def __init__(self, path=CACHE_PATH, ttl=DEFAULT_TTL, max_bytes=MAX_BYTES):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            url TEXT,
+            status INTEGER,
+            body TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            size INTEGER,
+            fetched_at REAL,
+            last_access REAL
+        )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)")
+        self._conn.commit()
+
+    def _bump(self, name):
+        # Scraper worker threads share the cache; += on a dict entry is not atomic
+        with self._lock:
+            self.stats[name] += 1
+
+    def _lookup(self, key):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT status, body, etag, last_modified, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+    def _touch(self, key, refreshed=False):
+        now = time.time()
+        with self._lock:
+            if refreshed:
+                self._conn.execute("UPDATE responses SET fetched_at = ?, last_access = ? WHERE key = ?", (now, now, key))
+            else:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+
+    def _store(self, key, url, res):
+        body = res.text
+        size = len(body.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, res.status_code, body, res.headers.get("ETag"),
+                 res.headers.get("Last-Modified"), size, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least-recently-used entries until the cache fits in max_bytes."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.stats["evictions"] += 1  # caller holds _lock
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def get(self, session, url, params=None, ttl=None, **kwargs):
+        """
+        GET through the cache. Returns a CachedResponse.
+
+        Fresh entries are returned without a request; stale ones are revalidated
+        with a conditional GET. Only 200 responses are stored.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        key = cache_key(url, params)
+        row = self._lookup(key)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if row:
+            status, body, etag, last_modified, fetched_at = row
+            if time.time() - fetched_at < ttl:
+                self._bump("hits")
+                self._touch(key)
+                return CachedResponse(url, status, body, True)
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        res = session.get(url, params=params, headers=headers, **kwargs)
+        if row and res.status_code == 304:
+            self._bump("revalidated")
+            self._touch(key, refreshed=True)
+            return CachedResponse(url, row[0], row[1], True)
+
+        self._bump("misses")
+        if res.status_code == 200:
+            self._store(key, url, res)
+        return CachedResponse(url, res.status_code, res.text, False)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def summary(self):
+        with self._lock:
+            s = dict(self.stats)
+        return (f"hits={s['hits']} revalidated={s['revalidated']} "
+                f"misses={s['misses']} evictions={s['evictions']}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_http_cache():
+    """Return the process-wide HttpCache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache()
+        return _cache
@@ -0,0 +1,61 @@
+# utils/import_report.py
+"""
+Import-time report for the crew entry points (a summary of `python -X importtime`).
+
+Usage:
+    python -m utils.import_report                  # reports `import crew`
+    python -m utils.import_report main tools.lead_scraper_tool --top 30
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+_LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module):
+    """Import a module in a fresh interpreter; return (wall seconds, [(name, self_us, cumulative_us, depth)])."""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    if proc.returncode != 0:
+        print(f"[IMPORT] `import {module}` failed:\n{proc.stderr.strip().splitlines()[-1] if proc.stderr else ''}")
+        return None, rows
+    return float(proc.stdout.strip().splitlines()[-1]), rows
+
+
+def report(module, top=20):
+    wall, rows = measure(module)
+    if wall is not None:
+        print(f"\n=== import {module}: {wall * 1000:.0f} ms wall ===")
+    else:
+        print(f"\n=== import {module}: failed ===")
+
+    # Per-module cost: top-level project modules and their heaviest dependencies
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cum_us, _ in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"{cum_us / 1000:14.1f} {self_us / 1000:9.1f}  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=["crew"])
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+    for module in args.modules:
+        report(module, args.top)
+
+
+if __name__ == "__main__":
+    main()
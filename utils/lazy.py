@@ -0,0 +1,67 @@
+# utils/lazy.py
+"""
+Lazily created module-level resources (model weights, API clients, repos).
+
+    client = lazy(lambda: OpenAI(api_key=...), "openai client")
+    client.chat.completions.create(...)   # built on first attribute access
+
+The wrapped object is created once, on first use, under a lock; attribute
+access is forwarded, so existing call sites keep working unchanged.
+"""
+
+import threading
+import time
+
+_loaded = {}  # name -> seconds spent creating the resource
+
+
+class LazyResource:
+    def __init__(self, factory, name=None):
+        self._factory = factory
+        self._name = name or getattr(factory, "__name__", "resource")
+        self._value = None
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the resource, creating it on the first call."""
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    start = time.perf_counter()
+                    self._value = self._factory()
+                    _loaded[self._name] = time.perf_counter() - start
+                    self._ready = True
+        return self._value
+
+    @property
+    def loaded(self):
+        return self._ready
+
+    def reset(self):
+        """Forget the resource so the next use creates it again."""
+        with self._lock:
+            self._value = None
+            self._ready = False
+
+    def __getattr__(self, item):
+        if item.startswith("__") or item in ("_factory", "_name", "_value", "_ready", "_lock"):
+            raise AttributeError(item)
+        return getattr(self.get(), item)
+
+    def __call__(self, *args, **kwargs):
+        return self.get()(*args, **kwargs)
+
+    def __repr__(self):
+        state = "loaded" if self._ready else "not loaded"
+        return f"<lazy {self._name} ({state})>"
+
+
+def lazy(factory, name=None):
+    """Wrap a zero-argument factory in a LazyResource."""
+    return LazyResource(factory, name)
+
+
+def loaded_resources():
+    """Return {name: seconds to create} for every lazy resource created so far."""
+    return dict(_loaded)
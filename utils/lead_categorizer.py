@@ -0,0 +1,187 @@
+# utils/lead_categorizer.py
+"""
+Lead categorization stage used by the lead scraper.
+
+Each lead goes through three steps, cheapest first:
+  1. a local keyword/regex classifier that settles clear-cut pages,
+  2. a memo of earlier labels keyed by a hash of (domain, normalized snippet),
+  3. batched gpt-4o-mini requests that label many ambiguous leads per call.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+
+from utils import llm_gateway
+
+CATEGORY_MODEL = "gpt-4o-mini"
+MEMO_PATH = Path(os.getenv("LEAD_CATEGORY_MEMO", "logs/lead_categories.db"))
+BATCH_SIZE = int(os.getenv("LEAD_CATEGORY_BATCH", "20"))
+SNIPPET_CHARS = 600  # per-lead context sent to the model
+
+# label -> pattern; a page is labelled locally when one rule clearly dominates
+CATEGORY_RULES = [
+    ("Event Venue", r"event venue|wedding venue|banquet hall|event space|ballroom|conference cent(?:er|re)|venue hire"),
+    ("Event Planner", r"event plann(?:er|ing)|wedding plann(?:er|ing)|event management|event coordinator"),
+    ("Tour Operator", r"tour operator|guided tours?|travel agency|itinerar(?:y|ies)|excursions?"),
+    ("Hotel", r"\bhotels?\b|\bresorts?\b|bed and breakfast|guest ?house|lodging"),
+    ("Restaurant", r"restaurant|bistro|brasserie|reservations?|tasting menu|\bcatering\b"),
+    ("Wellness Studio", r"\byoga\b|meditation|sound bath|wellness|retreat cent(?:er|re)|breathwork"),
+    ("Marketing Agency", r"marketing agency|digital agency|\bbranding\b|\bseo\b|social media management"),
+    ("Music Promoter", r"promoter|live music|concerts?|\bgigs?\b|festival"),
+]
+_COMPILED_RULES = [(label, re.compile(pattern, re.IGNORECASE)) for label, pattern in CATEGORY_RULES]
+
+_SYSTEM_PROMPT = (
+    "You classify businesses. For each numbered lead, give the business type in one or two words. "
+    "Respond with a JSON object mapping each lead number (as a string) to its business type."
+)
+
+
+def _normalize(text):
+    return " ".join((text or "").lower().split())[:SNIPPET_CHARS]
+
+
+def lead_hash(snippet, url=""):
+    """Memo key for a lead: SHA-256 of its domain and normalized snippet."""
+    domain = urlparse(url or "").netloc.lower()
+    return hashlib.sha256(f"{domain}\n{_normalize(snippet)}".encode("utf-8")).hexdigest()
+
+
+def classify_local(snippet):
+    """Return a label when the keyword rules are unambiguous, else None."""
+    scores = sorted(
+        ((len(rx.findall(snippet or "")), label) for label, rx in _COMPILED_RULES),
+        reverse=True
+    )
+    (top, label), (runner_up, _) = scores[0], scores[1]
+    if top >= 2 and top >= 2 * runner_up:
+        return label
+    return None
+
+
+class _LabelMemo:
+    def __init__(self, path=MEMO_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS labels (key TEXT PRIMARY KEY, label TEXT)")
+        self._conn.commit()
+
+    def get_many(self, keys):
+        found = {}
+        keys = list(set(keys))
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                found.update(self._conn.execute(
+                    f"SELECT key, label FROM labels WHERE key IN ({marks})", chunk
+                ).fetchall())
+        return found
+
+    def put_many(self, items):
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO labels (key, label) VALUES (?, ?)", items)
+            self._conn.commit()
+
+
+_memo = None
+_memo_lock = threading.Lock()
+
+def _get_memo():
+    global _memo
+    with _memo_lock:
+        if _memo is None:
+            _memo = _LabelMemo()
+        return _memo
+
+
+def _label_batch(client, batch):
+    """Ask the model to label a batch of (url, snippet) pairs; returns labels in order (None if unlabelled)."""
+    lines = []
+    for n, (url, snippet) in enumerate(batch, start=1):
+        domain = urlparse(url or "").netloc or "unknown"
+        lines.append(f"{n}. [{domain}] {_normalize(snippet)}")
+    try:
+        content = llm_gateway.chat(
+            [
+                {"role": "system", "content": _SYSTEM_PROMPT},
+                {"role": "user", "content": "\n\n".join(lines)}
+            ],
+            CATEGORY_MODEL,
+            caller="lead_categorizer",
+            response_format={"type": "json_object"},
+            client_override=client,
+        )
+        parsed = json.loads(content)
+        if not isinstance(parsed, dict):
+            raise ValueError(f"expected a JSON object, got {type(parsed).__name__}")
+    except Exception as e:
+        print(f"[WARN] Batch classification failed: {e}")
+        return [None] * len(batch)
+
+    labels = []
+    for n in range(1, len(batch) + 1):
+        label = parsed.get(str(n))
+        labels.append(str(label).strip() if label else None)
+    return labels
+
+
+def categorize_leads(leads, client=None, batch_size=BATCH_SIZE, stats=None):
+    """
+    Label a list of lead dicts (with 'url' and 'raw_text'). Returns labels in order.
+
+    `client` overrides the gateway's OpenAI client (e.g. a local test server).
+    Pass a dict as `stats` to collect how many leads were settled locally,
+    from the memo, or by the model, and how many model requests were made.
+    """
+    stats = stats if stats is not None else {}
+    for k in ("local", "memo", "llm", "requests"):
+        stats.setdefault(k, 0)
+
+    labels = [None] * len(leads)
+    keys = [lead_hash(lead.get("raw_text", ""), lead.get("url", "")) for lead in leads]
+
+    pending = []
+    for i, lead in enumerate(leads):
+        label = classify_local(lead.get("raw_text", ""))
+        if label:
+            labels[i] = label
+            stats["local"] += 1
+        else:
+            pending.append(i)
+
+    memo = _get_memo()
+    known = memo.get_many(keys[i] for i in pending)
+    unresolved = {}  # key -> indices still needing the model
+    for i in pending:
+        if keys[i] in known:
+            labels[i] = known[keys[i]]
+            stats["memo"] += 1
+        else:
+            unresolved.setdefault(keys[i], []).append(i)
+
+    if unresolved:
+        todo = list(unresolved.items())
+        for start in range(0, len(todo), batch_size):
+            chunk = todo[start:start + batch_size]
+            batch = [(leads[idx[0]].get("url", ""), leads[idx[0]].get("raw_text", "")) for _, idx in chunk]
+            batch_labels = _label_batch(client, batch)
+            stats["requests"] += 1
+            learned = []
+            for (key, indices), label in zip(chunk, batch_labels):
+                if label:
+                    learned.append((key, label))
+                for i in indices:
+                    labels[i] = label or "Unknown"
+                    stats["llm"] += 1
+            if learned:
+                memo.put_many(learned)
+
+    return labels
@@ -0,0 +1,228 @@
+# utils/llm_gateway.py
+"""
+Single entry point for OpenAI calls made by tools and utils.
+
+- persistent prompt -> response cache for deterministic calls (temperature 0)
+- token-bucket rate limiter plus a cap on concurrent requests
+- retries with jittered exponential backoff, bounded by a shared retry budget
+- per-call tokens and latency recorded in utils/training_db
+
+The client honours OPENAI_BASE_URL, so it can be pointed at a local mock server.
+"""
+
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from utils.lazy import lazy
+
+CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", "logs/llm_cache.db"))
+RATE_PER_SEC = float(os.getenv("LLM_RATE_PER_SEC", "5"))
+BURST = int(os.getenv("LLM_BURST", "10"))
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+REQUEST_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 20.0
+# Retry budget: starts at RETRY_BUDGET_MIN, each first-try success adds
+# RETRY_BUDGET_RATIO (up to RETRY_BUDGET_MAX), and each retry spends 1
+RETRY_BUDGET_MIN = 10.0
+RETRY_BUDGET_MAX = 50.0
+RETRY_BUDGET_RATIO = 0.2
+
+
+def _make_client():
+    from openai import OpenAI
+    # Retries are handled here, so the SDK's own retry loop is disabled
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=REQUEST_TIMEOUT, max_retries=0)
+
+client = lazy(_make_client, "openai gateway client")
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class _RetryBudget:
+    def __init__(self):
+        self.balance = RETRY_BUDGET_MIN
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.balance = min(RETRY_BUDGET_MAX, self.balance + RETRY_BUDGET_RATIO)
+
+    def withdraw(self):
+        with self._lock:
+            if self.balance < 1:
+                return False
+            self.balance -= 1
+            return True
+
+
+class _ResponseCache:
+    def __init__(self, path=CACHE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, model TEXT, response TEXT, created_at REAL)")
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key, model, response):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                               (key, model, json.dumps(response), time.time()))
+            self._conn.commit()
+
+
+_bucket = TokenBucket(RATE_PER_SEC, BURST)
+_slots = threading.BoundedSemaphore(MAX_CONCURRENCY)
+_budget = _RetryBudget()
+_cache = None
+_cache_lock = threading.Lock()
+stats = {"requests": 0, "cache_hits": 0, "retries": 0, "failures": 0}
+_stats_lock = threading.Lock()
+
+
+def get_response_cache():
+    # Not a lazy() proxy: LazyResource.get() would shadow _ResponseCache.get
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = _ResponseCache()
+        return _cache
+
+
+def _bump(name):
+    # Callers on many threads share the gateway; += on a dict entry is not atomic
+    with _stats_lock:
+        stats[name] += 1
+
+
+def _retryable():
+    import openai
+    return (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError)
+
+
+def _record(caller, kind, model, usage, latency, cached, retries):
+    try:
+        from utils.training_db import log_run
+        log_run(
+            agent="llm_gateway",
+            task=caller,
+            inputs={"model": model, "kind": kind},
+            outputs={},
+            metrics={
+                "type": kind,
+                "model": model,
+                "tokens": usage.get("total_tokens", 0),
+                "prompt_tokens": usage.get("prompt_tokens", 0),
+                "completion_tokens": usage.get("completion_tokens", 0),
+                "latency_ms": round(latency * 1000, 1),
+                "cached": cached,
+                "retries": retries,
+            }
+        )
+    except Exception as e:
+        print(f"[LLM] Could not record call metrics: {e}")
+
+
+def _call(fn, caller):
+    """Run fn() under the limiter with jittered exponential backoff. Returns (result, retries)."""
+    retryable = _retryable()
+    attempt = 0
+    while True:
+        _bucket.acquire()
+        try:
+            with _slots:
+                _bump("requests")
+                result = fn()
+        except retryable as e:
+            if attempt >= MAX_RETRIES or not _budget.withdraw():
+                _bump("failures")
+                raise
+            delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+            print(f"[LLM] {caller}: {type(e).__name__}, retrying in {delay:.1f}s")
+            attempt += 1
+            _bump("retries")
+            time.sleep(delay)
+            continue
+        if attempt == 0:
+            _budget.deposit()
+        return result, attempt
+
+
+def _cache_key(kind, model, payload):
+    blob = json.dumps({"kind": kind, "model": model, "payload": payload}, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def chat(messages, model, caller="unknown", temperature=0, cache=None, client_override=None, **kwargs):
+    """
+    Run a chat completion and return the message text.
+
+    cache defaults to True for temperature 0 (deterministic) calls; extra kwargs
+    (response_format, max_tokens, ...) are passed through and are part of the
+    cache key.
+    """
+    cache = (temperature == 0) if cache is None else cache
+    key = _cache_key("chat", model, {"messages": messages, "temperature": temperature, **kwargs}) if cache else None
+    if key:
+        hit = get_response_cache().get(key)
+        if hit is not None:
+            _bump("cache_hits")
+            _record(caller, "chat", model, {}, 0.0, True, 0)
+            return hit["content"]
+
+    api = client_override or client
+    start = time.perf_counter()
+    resp, retries = _call(
+        lambda: api.chat.completions.create(model=model, messages=messages, temperature=temperature, **kwargs),
+        caller
+    )
+    latency = time.perf_counter() - start
+    content = resp.choices[0].message.content
+    usage = resp.usage.model_dump() if getattr(resp, "usage", None) else {}
+    _record(caller, "chat", model, usage, latency, False, retries)
+    if key:
+        get_response_cache().put(key, model, {"content": content})
+    return content
+
+
+def embed(texts, model, caller="unknown", client_override=None):
+    """Embed a batch of texts and return one vector (list of floats) per text."""
+    api = client_override or client
+    start = time.perf_counter()
+    resp, retries = _call(lambda: api.embeddings.create(model=model, input=list(texts)), caller)
+    latency = time.perf_counter() - start
+    usage = resp.usage.model_dump() if getattr(resp, "usage", None) else {}
+    _record(caller, "embed", model, usage, latency, False, retries)
+    return [r.embedding for r in resp.data]
@@ -0,0 +1,195 @@
+# utils/notes_memory.py
+"""
+Rolling, token-budgeted memory of earlier training notes.
+
+Each saved note is folded into its campaign's digest: gpt-4o-mini merges the
+previous digest and the new note into at most DIGEST_TOKENS tokens, so a
+digest stays the same size however many notes went into it. build_memory()
+ranks the digests by relevance to the current feedback (embedding
+similarity) and recency, then packs them into MEMORY_TOKEN_BUDGET tokens.
+The memory block in a prompt therefore has a fixed ceiling as history grows.
+
+Savings are reported against what the replaced code pasted into the prompt:
+the full text of the last few notes (2 for write_training_notes, 5 docs for
+the uploader), whose token counts are kept per note.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from utils import llm_gateway
+from utils.embedding_cache import embed_cached, estimate_tokens
+
+MEMORY_PATH = Path(os.getenv("NOTES_MEMORY_PATH", "logs/notes_memory.db"))
+DIGEST_MODEL = "gpt-4o-mini"
+EMBEDDING_MODEL = "text-embedding-3-small"
+DIGEST_TOKENS = int(os.getenv("NOTES_DIGEST_TOKENS", "300"))
+MEMORY_TOKEN_BUDGET = int(os.getenv("NOTES_MEMORY_BUDGET", "900"))
+RELEVANCE_WEIGHT = 0.7  # the rest of the score is recency
+RECENCY_HALF_LIFE_DAYS = 30
+
+_DIGEST_PROMPT = (
+    "You maintain a running digest of training notes for the '{campaign}' campaign of a cultural "
+    "venue's outreach team. Merge the new notes into the digest: keep the most actionable, still "
+    "relevant insights and recommendations, drop repetition and anything the new notes supersede. "
+    "Reply with the updated digest only, as terse bullet points, at most {words} words."
+)
+
+
+class _DigestStore:
+    def __init__(self, path=MEMORY_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS digests (
+            campaign TEXT PRIMARY KEY,
+            digest TEXT,
+            digest_tokens INTEGER,
+            notes INTEGER,
+            source_tokens INTEGER,
+            updated_at TEXT
+        )
+        """)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS notes (campaign TEXT, tokens INTEGER, recorded_at TEXT)")
+        self._conn.commit()
+
+    def get(self, campaign):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM digests WHERE campaign = ?", (campaign,)).fetchone()
+        return dict(row) if row else None
+
+    def all(self):
+        with self._lock:
+            return [dict(r) for r in self._conn.execute("SELECT * FROM digests")]
+
+    def put(self, row, note_tokens):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO digests VALUES (:campaign, :digest, :digest_tokens, :notes, :source_tokens, :updated_at)",
+                row
+            )
+            self._conn.execute("INSERT INTO notes VALUES (?, ?, ?)", (row["campaign"], note_tokens, row["updated_at"]))
+
+    def recent_note_tokens(self, limit):
+        """Tokens of the last `limit` notes recorded, over all campaigns."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COALESCE(SUM(tokens), 0) FROM (SELECT tokens FROM notes ORDER BY rowid DESC LIMIT ?)", (limit,)
+            ).fetchone()[0]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = _DigestStore()
+        return _store
+
+
+def _clip(text, max_tokens):
+    """Cut text to roughly max_tokens, at a line break when possible."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    cut = text[:max_tokens * 4]
+    return cut[:cut.rfind("\n")] if "\n" in cut else cut
+
+
+def is_empty():
+    return not get_store().all()
+
+
+def record_note(campaign, text):
+    """Fold a new note into its campaign digest; returns the updated digest."""
+    campaign = campaign or "General"
+    store = get_store()
+    previous = store.get(campaign) or {"digest": "", "notes": 0, "source_tokens": 0}
+    digest = llm_gateway.chat(
+        [
+            {"role": "system", "content": _DIGEST_PROMPT.format(campaign=campaign, words=int(DIGEST_TOKENS * 0.7))},
+            {"role": "user", "content": f"Current digest:\n{previous['digest'] or '(empty)'}\n\nNew notes:\n{text}"},
+        ],
+        DIGEST_MODEL,
+        caller="notes_memory",
+        max_tokens=DIGEST_TOKENS,
+    )
+    digest = _clip(digest.strip(), DIGEST_TOKENS)
+    note_tokens = estimate_tokens(text)
+    store.put({
+        "campaign": campaign,
+        "digest": digest,
+        "digest_tokens": estimate_tokens(digest),
+        "notes": previous["notes"] + 1,
+        "source_tokens": previous["source_tokens"] + note_tokens,
+        "updated_at": datetime.utcnow().isoformat(),
+    }, note_tokens)
+    return digest
+
+
+def _relevance(query, digests):
+    """Cosine similarity of each digest to the query; zeros if embeddings are unavailable."""
+    try:
+        vectors = embed_cached(
+            [query] + digests, EMBEDDING_MODEL,
+            lambda texts: llm_gateway.embed(texts, EMBEDDING_MODEL, caller="notes_memory")
+        )
+    except Exception as e:
+        print(f"[MEMORY] Embeddings unavailable, ranking by recency only: {e}")
+        return np.zeros(len(digests))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-9
+    return vectors[1:] @ vectors[0]
+
+
+def _section(row):
+    return f"### {row['campaign']} ({row['notes']} notes, updated {row['updated_at'][:10]})\n{row['digest']}"
+
+
+def build_memory(query, campaign=None, budget_tokens=None, baseline_notes=2):
+    """
+    Memory block for a prompt and a savings report.
+
+    Digests are ranked by RELEVANCE_WEIGHT * similarity to query plus recency,
+    with the note's own campaign first, and added while they fit budget_tokens.
+    The report compares the tokens used with baseline_tokens, the full text of
+    the last baseline_notes notes that the caller used to paste instead.
+    """
+    budget_tokens = MEMORY_TOKEN_BUDGET if budget_tokens is None else budget_tokens
+    store = get_store()
+    rows = store.all()
+    report = {"memory_tokens": 0, "baseline_tokens": store.recent_note_tokens(baseline_notes),
+              "full_history_tokens": sum(r["source_tokens"] for r in rows), "digests": 0, "notes_covered": 0}
+    if rows:
+        now = datetime.utcnow()
+        similarity = _relevance(query or "", [r["digest"] for r in rows])
+        for row, sim in zip(rows, similarity):
+            age_days = (now - datetime.fromisoformat(row["updated_at"])).total_seconds() / 86400
+            recency = 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+            row["score"] = RELEVANCE_WEIGHT * float(sim) + (1 - RELEVANCE_WEIGHT) * recency
+            row["score"] += 1.0 if campaign and row["campaign"] == campaign else 0.0
+
+    sections = []
+    for row in sorted(rows, key=lambda r: r["score"], reverse=True):
+        section = _section(row)
+        cost = estimate_tokens(section)
+        if report["memory_tokens"] + cost > budget_tokens:
+            continue
+        sections.append(section)
+        report["memory_tokens"] += cost
+        report["digests"] += 1
+        report["notes_covered"] += row["notes"]
+
+    report["saved_tokens"] = max(report["baseline_tokens"] - report["memory_tokens"], 0)
+    print(f"[MEMORY] {report['memory_tokens']} memory tokens from {report['digests']} digest(s) "
+          f"covering {report['notes_covered']} note(s); the last {baseline_notes} note(s) in full would be "
+          f"{report['baseline_tokens']} tokens, saved {report['saved_tokens']}")
+    return "\n\n".join(sections), report
@@ -1,32 +1,207 @@
 from crewai.tools import tool
 import os
-import json
-from sentence_transformers import SentenceTransformer
+import re
+import bisect
+import hashlib
+import threading
 import numpy as np
+from utils.embedding_cache import embed_cached
+from utils.lazy import lazy
+from utils.vector_store import VectorStore
 
-INDEX_FILE = "data/semantic_index.json"
-MODEL = SentenceTransformer("all-MiniLM-L6-v2")
+DATA_DIR = "data"
+INDEX_DIR = os.path.join(DATA_DIR, "semantic_index")
+LEGACY_INDEX_FILE = os.path.join(DATA_DIR, "semantic_index.json")
+DOC_EXTENSIONS = (".txt", ".md", ".json")
+# Chunking: windows of whitespace-delimited tokens with overlap. all-MiniLM-L6-v2
+# truncates at 256 word pieces, so windows stay comfortably below that. Windows
+# are also capped in characters, since text without spaces (minified JSON, long
+# URLs, CJK) is a single whitespace token but many word pieces.
+CHUNK_TOKENS = int(os.getenv("INDEX_CHUNK_TOKENS", "160"))
+CHUNK_OVERLAP = int(os.getenv("INDEX_CHUNK_OVERLAP", "32"))
+CHUNK_MAX_CHARS = int(os.getenv("INDEX_CHUNK_MAX_CHARS", "1000"))
+EMBED_BATCH_SIZE = int(os.getenv("INDEX_BATCH_SIZE", "64"))
+CHUNKING = f"{CHUNK_TOKENS}/{CHUNK_OVERLAP}/{CHUNK_MAX_CHARS}"
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+def _load_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(MODEL_NAME)
+
+MODEL = lazy(_load_model, MODEL_NAME)
+
+_TOKEN_RE = re.compile(r"\S+")
+
+_store = None
+_store_mtime = None
+_store_lock = threading.Lock()
+
+def _iter_document_paths(root=DATA_DIR):
+    """Yield indexable files under data/, skipping the index itself."""
+    for dirpath, dirnames, files in os.walk(root):
+        dirnames[:] = [d for d in dirnames if os.path.join(dirpath, d) != INDEX_DIR]
+        for file in sorted(files):
+            path = os.path.join(dirpath, file)
+            if file.endswith(DOC_EXTENSIONS) and path != LEGACY_INDEX_FILE:
+                yield path
+
+def _get_store():
+    """Return the loaded vector store, reopening it if the index was rewritten."""
+    global _store, _store_mtime
+    vectors_path = os.path.join(INDEX_DIR, "vectors.npy")
+    mtime = os.path.getmtime(vectors_path) if os.path.exists(vectors_path) else None
+    with _store_lock:
+        if _store is None or mtime != _store_mtime:
+            _store = VectorStore.load(INDEX_DIR)
+            _store_mtime = mtime
+        return _store
+
+def _release_store():
+    global _store, _store_mtime
+    with _store_lock:
+        _store = _store_mtime = None
+
+def _read_document(path):
+    """Read one file, returning (text, sha256 of its bytes)."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    return raw.decode("utf-8", errors="replace"), hashlib.sha256(raw).hexdigest()
+
+def chunk_text(text, size=CHUNK_TOKENS, overlap=CHUNK_OVERLAP, max_chars=CHUNK_MAX_CHARS):
+    """
+    Split text into overlapping token windows of at most max_chars characters;
+    returns (start, end) character offsets. Tokens longer than max_chars are
+    cut into max_chars pieces first.
+    """
+    spans = []
+    for m in _TOKEN_RE.finditer(text):
+        start, end = m.span()
+        spans.extend((p, min(p + max_chars, end)) for p in range(start, end, max_chars))
+    if not spans:
+        return []
+    ends = [end for _, end in spans]
+    chunks = []
+    i = 0
+    while True:
+        # Up to `size` tokens, fewer if they would run past max_chars
+        j = max(i + 1, bisect.bisect_right(ends, spans[i][0] + max_chars, i, min(i + size, len(spans))))
+        chunks.append((spans[i][0], spans[j - 1][1]))
+        if j >= len(spans):
+            break
+        i = max(i + 1, j - overlap)
+        if spans[j][1] - spans[i][0] > max_chars:
+            i = j  # the overlap would leave no room for the next token
+    return chunks
+
+def _encode(texts):
+    return MODEL.encode(texts, batch_size=EMBED_BATCH_SIZE)
+
+def _embed_in_batches(chunks, batch_size=EMBED_BATCH_SIZE):
+    """Embed (row, passage) pairs batch_size at a time; returns (rows, passages, vectors)."""
+    rows, passages, vectors, batch = [], [], [], []
+
+    def _flush():
+        if batch:
+            texts = [text for _, text in batch]
+            vectors.append(embed_cached(texts, MODEL_NAME, _encode))
+            rows.extend(row for row, _ in batch)
+            passages.extend(texts)
+            batch.clear()
+
+    for row, text in chunks:
+        batch.append((row, text))
+        if len(batch) >= batch_size:
+            _flush()
+    _flush()
+    return rows, passages, vectors
 
 @tool("build_index_tool")
-def build_index_tool():
-    """Build or refresh the semantic search index."""
-    if not os.path.exists("data"):
+def build_index_tool(full: bool = False):
+    """Build or refresh the semantic search index. Only new or changed files are re-embedded unless full=True."""
+    if not os.path.exists(DATA_DIR):
         print("[INDEX] No data directory found.")
         return "No data to index."
 
-    entries = []
-    for root, _, files in os.walk("data"):
-        for file in files:
-            if file.endswith(".txt") or file.endswith(".md") or file.endswith(".json"):
-                with open(os.path.join(root, file), "r", encoding="utf-8") as f:
-                    content = f.read()
-                    entries.append({"file": file, "content": content})
+    # The previous index's metadata doubles as the manifest of what is indexed
+    old = None if full else VectorStore.load(INDEX_DIR)
+    if old is not None and old.rows and (old.rows[0].get("chunking") != CHUNKING or not old.has_passages):
+        old = None  # built with other chunk settings, whole-file or without passages: start over
+    manifest = {}
+    if old is not None:
+        for i, row in enumerate(old.rows):
+            manifest.setdefault(row["file"], []).append(i)
+
+    kept = []        # old row indices reused as-is
+    kept_rows = []
+    counts = {"added": 0, "changed": 0, "unchanged": 0}
+
+    def _changed_docs():
+        for path in _iter_document_paths():
+            rel = os.path.relpath(path, DATA_DIR)
+            stat = os.stat(path)
+            previous = manifest.pop(rel, None)
+            if previous:
+                first = old.rows[previous[0]]
+                if first["mtime"] == stat.st_mtime and first.get("size") == stat.st_size:
+                    counts["unchanged"] += 1
+                    kept.extend(previous)
+                    kept_rows.extend(old.rows[i] for i in previous)
+                    continue
+            text, digest = _read_document(path)
+            if previous and old.rows[previous[0]]["hash"] == digest:
+                # Touched but identical: keep vectors, refresh the manifest entry
+                counts["unchanged"] += 1
+                kept.extend(previous)
+                kept_rows.extend(dict(old.rows[i], mtime=stat.st_mtime, size=stat.st_size) for i in previous)
+                continue
+            counts["changed" if previous else "added"] += 1
+            for start, end in chunk_text(text):
+                # The passage is stored with its vector (in the store's passages file)
+                # so hits stay correct if the file is edited before the next index run
+                yield {"file": rel, "mtime": stat.st_mtime, "size": stat.st_size, "hash": digest,
+                       "start": start, "end": end, "chunking": CHUNKING}, text[start:end]
+
+    new_rows, new_passages, new_vectors = _embed_in_batches(_changed_docs())
+    removed = len(manifest)
+
+    if old is not None and not (new_rows or removed) and kept_rows == old.rows:
+        return f"Index up to date ({len(old.rows)} passages from {counts['unchanged']} documents)."
+
+    parts = []
+    if kept:
+        parts.append(np.asarray(old.vectors[np.array(kept)], dtype="float32"))
+    parts.extend(new_vectors)
+    rows = kept_rows + new_rows
+    passages = [old.passage(i) for i in kept] + new_passages
+    # Drop open memmaps of the old matrix before replacing it (required on Windows)
+    old = None
+    _release_store()
+    VectorStore.save(INDEX_DIR, np.concatenate(parts) if parts else np.empty((0, 0), "float32"), rows, passages)
+
+    return (f"Indexed {len(rows)} passages from {len({r['file'] for r in rows})} documents "
+            f"({counts['added']} added, {counts['changed']} changed, "
+            f"{removed} removed, {counts['unchanged']} unchanged).")
 
-    embeddings = MODEL.encode([e["content"] for e in entries])
-    index_data = [{"file": e["file"], "embedding": emb.tolist()} for e, emb in zip(entries, embeddings)]
+def rebuild_semantic_index(full=False):
+    """Refresh the data/ index outside of a crew run."""
+    return build_index_tool.run(full=full)
 
-    os.makedirs(os.path.dirname(INDEX_FILE), exist_ok=True)
-    with open(INDEX_FILE, "w", encoding="utf-8") as f:
-        json.dump(index_data, f, indent=4)
+def search_index(query: str, k: int = 5):
+    """Return the k indexed passages most similar to the query, with their text."""
+    store = _get_store()
+    if store is None:
+        return []
+    if not store.has_passages:
+        print("[INDEX] Index was built without stored passages; run build_index_tool to rebuild it.")
+        return []
+    query_vec = embed_cached([query], MODEL_NAME, _encode)[0]
+    return [dict(store.rows[i], score=score, passage=store.passage(i))
+            for score, i in store.search_ids(query_vec, k)]
 
-    return f"Indexed {len(entries)} documents."
+@tool("search_index_tool")
+def search_index_tool(query: str) -> str:
+    """Search the semantic index of data/ documents and return the best matching passages."""
+    hits = search_index(query)
+    if not hits:
+        return "No indexed documents."
+    return "\n\n".join(f"[{h['score']:.3f}] {h['file']} ({h['start']}-{h['end']}):\n{h['passage']}" for h in hits)
@@ -0,0 +1,155 @@
+# utils/sheets_sync.py
+"""
+Diff-based, batched sync of rows into a Google Sheets worksheet.
+
+Rows already in the sheet are kept as a set of row hashes, so deciding what
+to write is a local set lookup per row. New rows go out in one append_rows
+call per APPEND_CHUNK rows. The hash set is cached in SQLite together with
+the sheet's row count and last row; while a two-row probe shows the sheet
+has not changed, the cache is reused instead of downloading every value.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+CACHE_PATH = Path(os.getenv("SHEETS_SYNC_CACHE", "logs/sheets_sync.db"))
+APPEND_CHUNK = int(os.getenv("SHEETS_APPEND_CHUNK", "500"))
+# Re-download the full sheet at least this often, to notice edits above the last row
+CACHE_TTL = int(os.getenv("SHEETS_SYNC_CACHE_TTL", "3600"))
+
+
+def _normalize(row):
+    cells = ["" if cell is None else str(cell).strip() for cell in row]
+    while cells and not cells[-1]:
+        cells.pop()  # get_all_values pads rows to the sheet width
+    return cells
+
+
+def row_hash(row):
+    """Hash of a row's cell values, ignoring surrounding whitespace and trailing blanks."""
+    return hashlib.sha1("\x1f".join(_normalize(row)).encode("utf-8")).hexdigest()
+
+
+def sheet_key(worksheet):
+    return f"{worksheet.spreadsheet.id}:{worksheet.id}"
+
+
+class _HashCache:
+    def __init__(self, path=CACHE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS sheets (
+            key TEXT PRIMARY KEY, row_count INTEGER, last_hash TEXT, synced_at REAL
+        )""")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS row_hashes (key TEXT, hash TEXT, PRIMARY KEY (key, hash))")
+        self._conn.commit()
+
+    def load(self, key):
+        """(row_count, last_hash, synced_at, hashes) or None."""
+        with self._lock:
+            state = self._conn.execute(
+                "SELECT row_count, last_hash, synced_at FROM sheets WHERE key = ?", (key,)
+            ).fetchone()
+            if state is None:
+                return None
+            hashes = {h for (h,) in self._conn.execute("SELECT hash FROM row_hashes WHERE key = ?", (key,))}
+        return state + (hashes,)
+
+    def replace(self, key, row_count, last_hash, hashes):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM row_hashes WHERE key = ?", (key,))
+            self._conn.executemany("INSERT OR IGNORE INTO row_hashes VALUES (?, ?)", [(key, h) for h in hashes])
+            self._conn.execute("INSERT OR REPLACE INTO sheets VALUES (?, ?, ?, ?)",
+                               (key, row_count, last_hash, time.time()))
+
+    def extend(self, key, row_count, last_hash, hashes):
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO row_hashes VALUES (?, ?)", [(key, h) for h in hashes])
+            self._conn.execute("UPDATE sheets SET row_count = ?, last_hash = ? WHERE key = ?",
+                               (row_count, last_hash, key))
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = _HashCache()
+        return _cache
+
+
+def _probe_unchanged(worksheet, row_count, last_hash):
+    """True if the sheet still ends at row_count with the same last row (one small read)."""
+    if row_count == 0:
+        return not worksheet.get("1:1")
+    values = worksheet.get(f"{row_count}:{row_count + 1}")
+    return len(values) == 1 and row_hash(values[0]) == last_hash
+
+
+def existing_hashes(worksheet, stats=None):
+    """Row count and hash set of a worksheet, from the cache when the sheet is unchanged."""
+    stats = stats if stats is not None else {}
+    cache = get_cache()
+    key = sheet_key(worksheet)
+    cached = cache.load(key)
+    if cached is not None:
+        row_count, last_hash, synced_at, hashes = cached
+        if time.time() - synced_at < CACHE_TTL and _probe_unchanged(worksheet, row_count, last_hash):
+            stats["cache"] = "hit"
+            return row_count, hashes
+    values = worksheet.get_all_values()
+    hashes = {row_hash(row) for row in values}
+    last_hash = row_hash(values[-1]) if values else ""
+    cache.replace(key, len(values), last_hash, hashes)
+    stats["cache"] = "miss"
+    return len(values), hashes
+
+
+def append_in_chunks(worksheet, rows, chunk_size=APPEND_CHUNK, value_input_option="USER_ENTERED"):
+    """Append rows with one append_rows request per chunk; returns the number of requests."""
+    requests = 0
+    for i in range(0, len(rows), chunk_size):
+        worksheet.append_rows(rows[i:i + chunk_size], value_input_option=value_input_option)
+        requests += 1
+    return requests
+
+
+def sync_rows(worksheet, rows, headers=None, stats=None):
+    """
+    Append the rows that are not in the worksheet yet; returns how many were written.
+
+    headers are written first when the sheet is empty. stats, if given, receives
+    existing/new/skipped counts, append requests and whether the cache was used.
+    """
+    stats = stats if stats is not None else {}
+    row_count, hashes = existing_hashes(worksheet, stats)
+
+    new_rows, new_hashes = [], []
+    if row_count == 0 and headers:
+        new_rows.append(list(headers))
+        new_hashes.append(row_hash(headers))
+    seen = set(hashes)
+    skipped = 0
+    for row in rows:
+        h = row_hash(row)
+        if h in seen:
+            skipped += 1
+            continue
+        seen.add(h)
+        new_rows.append(list(row))
+        new_hashes.append(h)
+
+    stats.update(existing=row_count, new=len(new_rows), skipped=skipped)
+    stats["requests"] = append_in_chunks(worksheet, new_rows) if new_rows else 0
+    if new_rows:
+        get_cache().extend(sheet_key(worksheet), row_count + len(new_rows), new_hashes[-1], new_hashes)
+    return len(new_rows)
@@ -0,0 +1,143 @@
+# utils/task_scheduler.py
+"""
+Dependency-aware parallel runner for crew tasks.
+
+Each node is a callable that receives {dependency name: output}. Nodes run as
+soon as their dependencies finish, up to max_workers at a time. If a node
+fails, everything downstream of it is skipped while independent branches keep
+running. The report includes each node's timing and the run's critical path.
+"""
+
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class TaskGraphError(Exception):
+    pass
+
+
+class RunReport:
+    def __init__(self):
+        self.results = {}   # name -> output
+        self.errors = {}    # name -> formatted traceback
+        self.skipped = []   # names not run because a dependency failed
+        self.timings = {}   # name -> (start offset, duration) in seconds
+        self.wall_time = 0.0
+        self.critical_path = []
+        self.critical_path_time = 0.0
+
+    @property
+    def ok(self):
+        return not self.errors and not self.skipped
+
+    def summary(self):
+        serial = sum(d for _, d in self.timings.values())
+        lines = [f"[SCHEDULER] wall {self.wall_time:.1f}s | serial sum {serial:.1f}s | "
+                 f"critical path {self.critical_path_time:.1f}s: {' -> '.join(self.critical_path) or '-'}"]
+        for name, (start, duration) in sorted(self.timings.items(), key=lambda kv: kv[1][0]):
+            status = "failed" if name in self.errors else "ok"
+            lines.append(f"  {name:40s} +{start:6.1f}s  {duration:6.1f}s  {status}")
+        for name in self.skipped:
+            lines.append(f"  {name:40s} skipped (upstream failure)")
+        return "\n".join(lines)
+
+
+class TaskGraph:
+    def __init__(self):
+        self._nodes = {}  # name -> (fn, deps)
+
+    def add(self, name, fn, depends_on=()):
+        if name in self._nodes:
+            raise TaskGraphError(f"Duplicate task: {name}")
+        self._nodes[name] = (fn, tuple(depends_on))
+
+    def names(self):
+        return list(self._nodes)
+
+    def dependencies(self, name):
+        return self._nodes[name][1]
+
+    def _validate(self):
+        for name, (_, deps) in self._nodes.items():
+            missing = [d for d in deps if d not in self._nodes]
+            if missing:
+                raise TaskGraphError(f"{name} depends on unknown task(s): {', '.join(missing)}")
+        # Kahn's algorithm: anything left over sits on a cycle
+        indegree = {n: len(deps) for n, (_, deps) in self._nodes.items()}
+        ready = [n for n, d in indegree.items() if d == 0]
+        seen = 0
+        while ready:
+            node = ready.pop()
+            seen += 1
+            for other, (_, deps) in self._nodes.items():
+                if node in deps:
+                    indegree[other] -= 1
+                    if indegree[other] == 0:
+                        ready.append(other)
+        if seen != len(self._nodes):
+            cyclic = sorted(n for n, d in indegree.items() if d > 0)
+            raise TaskGraphError(f"Dependency cycle among: {', '.join(cyclic)}")
+
+    def _critical_path(self, timings):
+        """Longest chain of dependent tasks by measured duration."""
+        best = {}
+
+        def _finish(name):
+            if name not in best:
+                deps = [d for d in self.dependencies(name) if d in timings]
+                prev = max((_finish(d) for d in deps), key=lambda x: x[0], default=(0.0, []))
+                best[name] = (prev[0] + timings[name][1], prev[1] + [name])
+            return best[name]
+
+        paths = [_finish(n) for n in timings]
+        return max(paths, key=lambda x: x[0], default=(0.0, []))
+
+    def run(self, max_workers=4):
+        """Run every node, respecting dependencies. Returns a RunReport."""
+        self._validate()
+        report = RunReport()
+        remaining = {n: set(deps) for n, (_, deps) in self._nodes.items()}
+        dependents = {n: [m for m, (_, deps) in self._nodes.items() if n in deps] for n in self._nodes}
+        t0 = time.perf_counter()
+
+        def _call(name):
+            fn, deps = self._nodes[name]
+            start = time.perf_counter()
+            try:
+                return fn({d: report.results[d] for d in deps})
+            finally:
+                report.timings[name] = (start - t0, time.perf_counter() - start)
+
+        def _skip(name):
+            for child in dependents[name]:
+                if child in remaining:
+                    del remaining[child]
+                    report.skipped.append(child)
+                    _skip(child)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            running = {}
+            while remaining or running:
+                for name in [n for n, deps in remaining.items() if not deps]:
+                    del remaining[name]
+                    running[pool.submit(_call, name)] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        report.results[name] = future.result()
+                    except Exception:
+                        report.errors[name] = traceback.format_exc()
+                        print(f"[SCHEDULER] {name} failed:\n{report.errors[name]}")
+                        _skip(name)
+                        continue
+                    for child in dependents[name]:
+                        if child in remaining:
+                            remaining[child].discard(name)
+
+        report.wall_time = time.perf_counter() - t0
+        report.critical_path_time, report.critical_path = self._critical_path(report.timings)
+        return report
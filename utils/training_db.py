@@ -1,52 +1,307 @@
 # utils/training_db.py
 import sqlite3
 import json
+import os
+import time
+import queue
+import atexit
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
+from utils import cost_tracker
 
 DB_PATH = Path("logs/training.db")
-DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-def _get_conn():
-    conn = sqlite3.connect(DB_PATH)
+# Background writer: queued log_run rows are committed in one transaction
+# every FLUSH_INTERVAL_MS or as soon as FLUSH_MAX_ROWS are waiting.
+FLUSH_INTERVAL_MS = int(os.getenv("TRAINING_DB_FLUSH_MS", "200"))
+FLUSH_MAX_ROWS = int(os.getenv("TRAINING_DB_FLUSH_ROWS", "500"))
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()  # resolved DB paths whose schema has been ensured
+
+def _connect():
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=30)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+def _get_conn():
+    """Per-thread connection, created (and the schema ensured) on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != DB_PATH:
+        init_db()
+        conn = _local.conn = _connect()
+        _local.path = DB_PATH
     return conn
 
 def init_db():
-    conn = _get_conn()
-    c = conn.cursor()
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS runs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
+    # Keyed by path: DB_PATH is repointed by benchmarks and retention tooling
+    path = DB_PATH.resolve()
+    with _init_lock:
+        if path in _initialized:
+            return
+        conn = _connect()
+        # Only takes effect on a new file; training_retention converts older ones
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        c = conn.cursor()
+        c.execute("""
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            agent TEXT,
+            task TEXT,
+            inputs TEXT,
+            outputs TEXT,
+            metrics TEXT,
+            timestamp TEXT
+        )
+        """)
+        _migrate(conn)
+        conn.commit()
+        conn.close()
+        _initialized.add(path)
+
+# Cost of one run: its recorded api cost, else chat tokens at the given rate, else a flat fee
+_COST_EXPR = "CASE WHEN cost_usd IS NOT NULL THEN cost_usd WHEN type = 'chat' AND tokens IS NOT NULL THEN tokens * ? ELSE ? END"
+
+# Metrics promoted to real columns so filters and cost rollups run in SQL
+_METRIC_COLUMNS = [("type", "TEXT"), ("model", "TEXT"), ("tokens", "INTEGER"), ("cost_usd", "REAL")]
+SCHEMA_VERSION = 2
+
+def _migrate(conn):
+    """Bring an existing runs table up to SCHEMA_VERSION (tracked in PRAGMA user_version)."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < 1:
+        _migrate_metric_columns(conn)
+    if version < 2:
+        _migrate_rollups(conn)
+    if version < SCHEMA_VERSION:
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+def _migrate_metric_columns(conn):
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+    for name, kind in _METRIC_COLUMNS:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE runs ADD COLUMN {name} {kind}")
+    # Backfill from the JSON metrics blob of rows written before the columns existed
+    conn.execute("""
+    UPDATE runs SET
+        type = json_extract(metrics, '$.type'),
+        model = json_extract(metrics, '$.model'),
+        tokens = json_extract(metrics, '$.tokens'),
+        cost_usd = json_extract(metrics, '$.api_cost')
+    WHERE json_valid(metrics)
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs(timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_agent_ts ON runs(agent, timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_task_ts ON runs(task, timestamp)")
+
+# Hourly and daily cost per (agent, task, model), kept current by the writer.
+# Missing agent/task/model are stored as '' so they take part in the primary key.
+def _migrate_rollups(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS cost_rollups (
+        granularity TEXT,
+        bucket TEXT,
         agent TEXT,
         task TEXT,
-        inputs TEXT,
-        outputs TEXT,
-        metrics TEXT,
-        timestamp TEXT
+        model TEXT,
+        runs INTEGER,
+        tokens INTEGER,
+        cost REAL,
+        PRIMARY KEY (granularity, bucket, agent, task, model)
     )
     """)
-    conn.commit()
-    conn.close()
+    conn.execute("DELETE FROM cost_rollups")
+    for granularity, width in (("hour", 13), ("day", 10)):
+        conn.execute(f"""
+        INSERT INTO cost_rollups
+        SELECT ?, substr(timestamp, 1, {width}), COALESCE(agent, ''), COALESCE(task, ''), COALESCE(model, ''),
+               COUNT(*), COALESCE(SUM(tokens), 0), SUM({_COST_EXPR})
+        FROM runs GROUP BY 2, 3, 4, 5
+        """, (granularity, cost_tracker.PRICING["openai_chat"], cost_tracker.DEFAULT_RUN_COST))
+
+_ROLLUP_SQL = """
+INSERT INTO cost_rollups (granularity, bucket, agent, task, model, runs, tokens, cost)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (granularity, bucket, agent, task, model) DO UPDATE SET
+    runs = runs + excluded.runs,
+    tokens = tokens + excluded.tokens,
+    cost = cost + excluded.cost
+"""
+
+def _rollup_rows(rows):
+    """Pre-aggregate a batch of insert rows into rollup upserts; returns (upserts, batch cost)."""
+    totals = {}
+    batch_cost = 0.0
+    for agent, task, _, _, _, timestamp, run_type, model, tokens, api_cost in rows:
+        cost = cost_tracker.run_cost(run_type, tokens, api_cost)
+        batch_cost += cost
+        for granularity, width in (("hour", 13), ("day", 10)):
+            key = (granularity, timestamp[:width], agent or "", task or "", model or "")
+            runs_, tokens_, cost_ = totals.get(key, (0, 0, 0.0))
+            totals[key] = (runs_ + 1, tokens_ + (tokens or 0), cost_ + cost)
+    return [key + value for key, value in totals.items()], batch_cost
+
+_INSERT_SQL = (
+    "INSERT INTO runs (agent, task, inputs, outputs, metrics, timestamp, type, model, tokens, cost_usd) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+class _BatchWriter(threading.Thread):
+    def __init__(self):
+        super().__init__(name="training-db-writer", daemon=True)
+        self.queue = queue.Queue()
+
+    def run(self):
+        conn, path = _connect(), DB_PATH
+        cost_tracker.watcher.seed(conn)
+        interval = FLUSH_INTERVAL_MS / 1000
+        while True:
+            rows, waiters = [], []
+            item = self.queue.get()
+            deadline = None
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break  # flush requested: write what we have now
+                rows.append(item)
+                if len(rows) >= FLUSH_MAX_ROWS:
+                    break
+                if deadline is None:
+                    deadline = time.monotonic() + interval
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if rows and path != DB_PATH:
+                # DB_PATH was repointed: write to the new file from here on
+                init_db()
+                conn.close()
+                conn, path = _connect(), DB_PATH
+                cost_tracker.watcher.seed(conn)
+            if rows:
+                try:
+                    upserts, batch_cost = _rollup_rows(rows)
+                    with conn:
+                        conn.executemany(_INSERT_SQL, rows)
+                        conn.executemany(_ROLLUP_SQL, upserts)
+                    cost_tracker.watcher.add(batch_cost)
+                except Exception as e:
+                    print(f"[TRAINING_DB] Failed to write {len(rows)} run(s): {e}")
+            for event in waiters:
+                event.set()
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def _get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            init_db()
+            _writer = _BatchWriter()
+            _writer.start()
+        return _writer
+
+def flush(timeout: Optional[float] = 10.0):
+    """Block until every queued log_run row has been committed."""
+    if _writer is None:
+        return
+    done = threading.Event()
+    _writer.queue.put(done)
+    done.wait(timeout)
+
+atexit.register(flush)
 
 def log_run(agent: str, task: str, inputs: Dict[str, Any], outputs: Dict[str, Any], metrics: Optional[Dict[str,Any]] = None):
-    conn = _get_conn()
-    c = conn.cursor()
-    c.execute(
-        "INSERT INTO runs (agent, task, inputs, outputs, metrics, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
-        (agent, task, json.dumps(inputs, default=str), json.dumps(outputs, default=str), json.dumps(metrics or {}, default=str), datetime.utcnow().isoformat())
+    """Queue a run record; it is committed by the background writer within FLUSH_INTERVAL_MS."""
+    metrics = metrics or {}
+    row = (
+        agent, task, json.dumps(inputs, default=str), json.dumps(outputs, default=str),
+        json.dumps(metrics, default=str), datetime.utcnow().isoformat(),
+        metrics.get("type"), metrics.get("model"), metrics.get("tokens"), metrics.get("api_cost"),
     )
-    conn.commit()
-    conn.close()
+    _get_writer().queue.put(row)
 
-def get_recent_runs(limit: int = 50) -> List[Dict[str,Any]]:
-    conn = _get_conn()
-    c = conn.cursor()
+def _maybe_hydrate(rows, include_archived):
+    if not include_archived:
+        return rows
+    from utils import training_retention
+    return training_retention.hydrate(rows)
+
+def get_recent_runs(limit: int = 50, include_archived: bool = False) -> List[Dict[str,Any]]:
+    flush()
+    c = _get_conn().cursor()
     c.execute("SELECT * FROM runs ORDER BY id DESC LIMIT ?", (limit,))
-    rows = [dict(r) for r in c.fetchall()]
-    conn.close()
-    return rows
+    return _maybe_hydrate([dict(r) for r in c.fetchall()], include_archived)
+
+def _ts(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _where(start, end, agent, task):
+    clauses, params = ["timestamp >= ?"], [_ts(start)]
+    if end is not None:
+        clauses.append("timestamp < ?")
+        params.append(_ts(end))
+    if agent is not None:
+        clauses.append("agent = ?")
+        params.append(agent)
+    if task is not None:
+        clauses.append("task = ?")
+        params.append(task)
+    return " AND ".join(clauses), params
+
+def runs_between(start, end=None, agent: Optional[str] = None, task: Optional[str] = None,
+                 limit: Optional[int] = None, include_archived: bool = False) -> List[Dict[str,Any]]:
+    """
+    Runs with start <= timestamp < end (UTC datetimes or ISO strings), oldest first.
+
+    Runs past the retention window have inputs/outputs of None unless
+    include_archived is set, which reads them back from the monthly archive.
+    """
+    flush()
+    where, params = _where(start, end, agent, task)
+    sql = f"SELECT * FROM runs WHERE {where} ORDER BY timestamp"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return _maybe_hydrate([dict(r) for r in _get_conn().execute(sql, params).fetchall()], include_archived)
+
+def aggregate_cost(start, end=None, agent: Optional[str] = None, task: Optional[str] = None,
+                   group_by: Optional[str] = None, chat_token_price: Optional[float] = None,
+                   default_run_cost: Optional[float] = None):
+    """
+    Sum runs, tokens and estimated cost over a time window in SQL.
 
-# Initialize DB on import
-init_db()
+    group_by may be 'agent', 'task' or 'model'; then a list of per-group dicts
+    is returned, otherwise a single dict. Prices default to cost_tracker's, so
+    costs agree with run_cost() and the cost rollups.
+    """
+    if group_by not in (None, "agent", "task", "model"):
+        raise ValueError(f"Unsupported group_by: {group_by}")
+    flush()
+    where, params = _where(start, end, agent, task)
+    select = f"COUNT(*) AS runs, COALESCE(SUM(tokens), 0) AS tokens, COALESCE(SUM({_COST_EXPR}), 0) AS cost"
+    if chat_token_price is None:
+        chat_token_price = cost_tracker.PRICING["openai_chat"]
+    if default_run_cost is None:
+        default_run_cost = cost_tracker.DEFAULT_RUN_COST
+    params = [chat_token_price, default_run_cost] + params
+    if group_by:
+        rows = _get_conn().execute(
+            f"SELECT {group_by} AS grp, {select} FROM runs WHERE {where} GROUP BY {group_by} ORDER BY cost DESC",
+            params
+        ).fetchall()
+        return [{group_by: r["grp"], "runs": r["runs"], "tokens": r["tokens"], "cost": r["cost"]} for r in rows]
+    r = _get_conn().execute(f"SELECT {select} FROM runs WHERE {where}", params).fetchone()
+    return {"runs": r["runs"], "tokens": r["tokens"], "cost": r["cost"]}
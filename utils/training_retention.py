@@ -0,0 +1,194 @@
+"""
+Retention for logs/training.db.
+
+Runs keep their full inputs/outputs for RETAIN_DAYS. After that, compact()
+appends them to a monthly gzip JSONL segment under ARCHIVE_DIR and clears
+the payloads in the database, leaving the summary columns (agent, task,
+metrics, type, model, tokens, cost_usd) and the cost rollups intact. Freed
+pages are handed back with incremental vacuum so compaction never rewrites
+the whole file.
+
+Archived payloads are read back with read_archive() or transparently via
+training_db.runs_between(..., include_archived=True).
+
+    python -m utils.training_retention [--days N] [--dry-run]
+"""
+import argparse
+import gzip
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from utils import training_db
+
+RETAIN_DAYS = int(os.getenv("TRAINING_DB_RETAIN_DAYS", "30"))
+ARCHIVE_DIR = Path(os.getenv("TRAINING_DB_ARCHIVE_DIR", "logs/archive/training"))
+COMPACT_BATCH_ROWS = 1000
+VACUUM_PAGES = 2000  # pages returned to the OS per incremental_vacuum step
+
+_compact_lock = threading.Lock()
+
+
+def segment_path(month: str) -> Path:
+    return ARCHIVE_DIR / f"runs-{month}.jsonl.gz"
+
+
+def archived_months() -> List[str]:
+    return sorted(p.name[len("runs-"):-len(".jsonl.gz")] for p in ARCHIVE_DIR.glob("runs-*.jsonl.gz"))
+
+
+def _ensure_incremental_vacuum(conn):
+    """Switch an existing database to auto_vacuum=INCREMENTAL (needs one full VACUUM)."""
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        return
+    print("[RETENTION] Enabling incremental vacuum (one-time full VACUUM)...")
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("VACUUM")
+
+
+def _append_segment(month: str, rows: List[Dict[str, Any]]):
+    """Append rows to the month's segment; each call adds one gzip member."""
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(segment_path(month), "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+            for row in rows:
+                gz.write((json.dumps(row, default=str) + "\n").encode("utf-8"))
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def compact(retain_days: Optional[int] = None, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Archive the payloads of runs older than retain_days and vacuum the freed pages.
+
+    A segment is written and fsynced before the matching payloads are cleared,
+    so an interrupted run can only leave duplicates in the archive (readers
+    keep the last copy of each id), never lose a payload.
+    """
+    retain_days = RETAIN_DAYS if retain_days is None else retain_days
+    cutoff = (datetime.utcnow() - timedelta(days=retain_days)).isoformat()
+    training_db.flush()
+    training_db.init_db()
+    summary = {"cutoff": cutoff, "archived": 0, "months": {}, "freed_bytes": 0}
+
+    with _compact_lock:
+        conn = training_db._connect()
+        try:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            if dry_run:
+                for r in conn.execute(
+                    "SELECT substr(timestamp, 1, 7) AS month, COUNT(*) AS n FROM runs "
+                    "WHERE timestamp < ? AND inputs IS NOT NULL GROUP BY month", (cutoff,)
+                ):
+                    summary["months"][r["month"]] = r["n"]
+                    summary["archived"] += r["n"]
+                return summary
+
+            _ensure_incremental_vacuum(conn)
+            while True:
+                rows = conn.execute(
+                    "SELECT * FROM runs WHERE timestamp < ? AND inputs IS NOT NULL ORDER BY id LIMIT ?",
+                    (cutoff, COMPACT_BATCH_ROWS)
+                ).fetchall()
+                if not rows:
+                    break
+                by_month: Dict[str, List[Dict[str, Any]]] = {}
+                for r in rows:
+                    by_month.setdefault(r["timestamp"][:7], []).append(
+                        {k: r[k] for k in ("id", "agent", "task", "inputs", "outputs", "metrics", "timestamp")})
+                for month, month_rows in by_month.items():
+                    _append_segment(month, month_rows)
+                    summary["months"][month] = summary["months"].get(month, 0) + len(month_rows)
+                # Delete and re-insert rather than UPDATE: clearing a payload in place
+                # leaves the b-tree pages half empty, a delete lets SQLite rebalance
+                # them onto the freelist where incremental_vacuum can release them.
+                columns = rows[0].keys()
+                summaries = [tuple(None if k in ("inputs", "outputs") else r[k] for k in columns) for r in rows]
+                with conn:
+                    conn.executemany("DELETE FROM runs WHERE id = ?", [(r["id"],) for r in rows])
+                    conn.executemany(
+                        f"INSERT INTO runs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                        summaries
+                    )
+                summary["archived"] += len(rows)
+
+            while True:
+                free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if not free:
+                    break
+                # executescript steps the pragma to completion; execute() frees a single page
+                conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_PAGES});")
+                summary["freed_bytes"] += min(free, VACUUM_PAGES) * page_size
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            conn.close()
+
+    _segment_cache.clear()
+    print(f"[RETENTION] Archived payloads of {summary['archived']} run(s) older than {retain_days} day(s); "
+          f"freed {summary['freed_bytes'] / 1e6:.1f} MB")
+    return summary
+
+
+# Parsed segments keyed by path, invalidated when the file changes
+_segment_cache: Dict[Path, Any] = {}
+_segment_lock = threading.Lock()
+
+
+def _load_segment(month: str) -> Dict[int, Dict[str, Any]]:
+    path = segment_path(month)
+    if not path.exists():
+        return {}
+    stat = path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _segment_lock:
+        cached = _segment_cache.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+    rows = {}
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                rows[row["id"]] = row
+    with _segment_lock:
+        _segment_cache[path] = (stamp, rows)
+    return rows
+
+
+def read_archive(month: str, agent: Optional[str] = None, task: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Archived runs of one month ('YYYY-MM'), oldest first."""
+    for _, row in sorted(_load_segment(month).items()):
+        if agent is not None and row.get("agent") != agent:
+            continue
+        if task is not None and row.get("task") != task:
+            continue
+        yield row
+
+
+def hydrate(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Fill in archived inputs/outputs of runs whose payloads were compacted away."""
+    rows = list(rows)
+    for row in rows:
+        if row.get("inputs") is None and row.get("timestamp"):
+            archived = _load_segment(row["timestamp"][:7]).get(row["id"])
+            if archived:
+                row["inputs"] = archived["inputs"]
+                row["outputs"] = archived["outputs"]
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old training.db payloads and vacuum the database.")
+    parser.add_argument("--days", type=int, default=None, help=f"keep full payloads this many days (default {RETAIN_DAYS})")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be archived")
+    args = parser.parse_args()
+    summary = compact(args.days, dry_run=args.dry_run)
+    if args.dry_run:
+        print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
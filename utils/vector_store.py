@@ -0,0 +1,137 @@
+# utils/vector_store.py
+"""
+Minimal on-disk vector store: a float32 .npy matrix plus a JSON metadata sidecar.
+
+The matrix is opened with np.load(mmap_mode="r"), so loading is near-instant and
+only the pages touched by a search are read into memory. Rows are stored
+L2-normalized, which makes a matrix-vector product a cosine-similarity search.
+
+Optionally each row also has a text passage. Passages are concatenated UTF-8 in
+a side file with an array of byte offsets, and only the passages of hits are
+read, so the metadata stays small.
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+
+VECTORS_FILE = "vectors.npy"
+METADATA_FILE = "metadata.json"
+PASSAGES_FILE = "passages.txt"
+OFFSETS_FILE = "passage_offsets.npy"
+SEARCH_BLOCK_ROWS = 65536  # rows scored per block, bounds temporary memory
+
+
+def _normalize(matrix):
+    matrix = np.asarray(matrix, dtype="float32")
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class VectorStore:
+    def __init__(self, directory, vectors, rows, passages=None, offsets=None):
+        self.directory = directory
+        self.vectors = vectors  # (n, dim) float32, usually a read-only memmap
+        self.rows = rows        # one metadata dict per vector row
+        # Open handle on the passages file, so a store keeps reading the version
+        # it was loaded with even after a rebuild replaces the file
+        self._passages = passages
+        self._offsets = offsets  # (n + 1,) int64 byte offsets into the passages file
+        self._passages_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.rows)
+
+    @classmethod
+    def load(cls, directory):
+        """Open a saved store, or return None if there is none."""
+        vectors_path = os.path.join(directory, VECTORS_FILE)
+        metadata_path = os.path.join(directory, METADATA_FILE)
+        if not (os.path.exists(vectors_path) and os.path.exists(metadata_path)):
+            return None
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            rows = json.load(f)
+        vectors = np.load(vectors_path, mmap_mode="r")
+        passages = offsets = None
+        offsets_path = os.path.join(directory, OFFSETS_FILE)
+        passages_path = os.path.join(directory, PASSAGES_FILE)
+        if os.path.exists(offsets_path) and os.path.exists(passages_path):
+            offsets = np.load(offsets_path)
+            if len(offsets) == len(rows) + 1:
+                passages = open(passages_path, "rb")
+            else:
+                offsets = None  # left over from another save
+        return cls(directory, vectors, rows, passages, offsets)
+
+    @property
+    def has_passages(self):
+        return self._offsets is not None
+
+    def passage(self, i):
+        """Text passage stored for row i (None if the store has no passages)."""
+        if self._offsets is None:
+            return None
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        with self._passages_lock:
+            self._passages.seek(start)
+            raw = self._passages.read(end - start)
+        return raw.decode("utf-8")
+
+    @classmethod
+    def save(cls, directory, vectors, rows, passages=None):
+        """
+        Write vectors, metadata and (if given, one per row) passages atomically
+        and return the reopened store.
+        """
+        os.makedirs(directory, exist_ok=True)
+        vectors = _normalize(vectors).reshape(len(rows), -1) if len(rows) else np.empty((0, 0), "float32")
+
+        vectors_tmp = os.path.join(directory, VECTORS_FILE + ".tmp")
+        metadata_tmp = os.path.join(directory, METADATA_FILE + ".tmp")
+        with open(vectors_tmp, "wb") as f:
+            np.save(f, vectors)
+        with open(metadata_tmp, "w", encoding="utf-8") as f:
+            json.dump(rows, f)
+        if passages is not None:
+            passages_tmp = os.path.join(directory, PASSAGES_FILE + ".tmp")
+            offsets_tmp = os.path.join(directory, OFFSETS_FILE + ".tmp")
+            offsets = np.zeros(len(rows) + 1, dtype="int64")
+            with open(passages_tmp, "wb") as f:
+                for i, text in enumerate(passages):
+                    offsets[i + 1] = offsets[i] + f.write(text.encode("utf-8"))
+            with open(offsets_tmp, "wb") as f:
+                np.save(f, offsets)
+            os.replace(passages_tmp, os.path.join(directory, PASSAGES_FILE))
+            os.replace(offsets_tmp, os.path.join(directory, OFFSETS_FILE))
+        elif os.path.exists(os.path.join(directory, OFFSETS_FILE)):
+            os.remove(os.path.join(directory, OFFSETS_FILE))  # stale passages of an earlier save
+        os.replace(vectors_tmp, os.path.join(directory, VECTORS_FILE))
+        os.replace(metadata_tmp, os.path.join(directory, METADATA_FILE))
+        return cls.load(directory)
+
+    def search(self, query_vector, k=5):
+        """Return up to k (score, row) pairs, best first, by cosine similarity."""
+        return [(score, self.rows[i]) for score, i in self.search_ids(query_vector, k)]
+
+    def search_ids(self, query_vector, k=5):
+        """Return up to k (score, row index) pairs, best first, by cosine similarity."""
+        n = len(self.rows)
+        if not n:
+            return []
+        q = _normalize(query_vector).reshape(-1)
+        k = min(k, n)
+
+        best_scores = np.empty(0, dtype="float32")
+        best_ids = np.empty(0, dtype="int64")
+        for start in range(0, n, SEARCH_BLOCK_ROWS):
+            scores = np.asarray(self.vectors[start:start + SEARCH_BLOCK_ROWS] @ q)
+            best_scores = np.concatenate([best_scores, scores])
+            best_ids = np.concatenate([best_ids, np.arange(start, start + len(scores))])
+            if len(best_scores) > k:
+                keep = np.argpartition(-best_scores, k - 1)[:k]
+                best_scores, best_ids = best_scores[keep], best_ids[keep]
+
+        order = np.argsort(-best_scores)
+        return [(float(best_scores[i]), int(best_ids[i])) for i in order]